@@ -0,0 +1,698 @@
+"""
+Benchmarks MeFu (à lancer à la main, hors démo).
+
+    python bench_mefu.py startup            # temps d'import / RSS
+    python bench_mefu.py gestures [--recording f.mflm] [--labels f.json] [--mefu]
+                                            # reconnaissance rejouée, sans caméra
+    python bench_mefu.py smoothing [--recording f.mflm]
+                                            # coût / gain du lissage One-Euro
+    python bench_mefu.py hands [--max-hands 4]
+                                            # coût par image du HandTracker selon le nombre de mains
+    python bench_mefu.py backends [--frames 300]
+                                            # détecteurs de gestes : chargement, latence
+                                            # et CPU par image, gestes détectés
+    python bench_mefu.py soak [--cycles 5000]
+                                            # ouvertures / fermetures répétées :
+                                            # observateurs, coût d'un touch, mémoire
+    python bench_mefu.py search [--nodes 65000]
+                                            # construction de l'index, latence des requêtes
+    python bench_mefu.py hotpaths [--iterations 50]
+                                            # ouverture du menu (tailles / profondeurs),
+                                            # sous-menu / retour, navigate, aperçu caméra
+
+Chaque bench écrit son résultat en JSON. --save-baseline f.json enregistre
+le résultat comme référence (une entrée par bench) ; --baseline f.json
+compare les temps (clés *_s, *_ms, *_us, hors p95 / p99 / max) à cette référence et sort en
+erreur (code 1) si l'un dépasse la tolérance (--tolerance, 25 % par défaut). hotpaths sort aussi en erreur si une
+ligne reste invisible après l'ouverture du menu (clé "failures").
+"""
+import os
+import sys
+import json
+import time
+import gc
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from mefu_stats import percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Kivy sans console ni parsing d'arguments ; fenêtre SDL hors écran (offscreen)
+BENCH_ENV = {
+    "KIVY_NO_ARGS": "1",
+    "KIVY_NO_CONSOLELOG": "1",
+    "SDL_VIDEODRIVER": os.environ.get("SDL_VIDEODRIVER", "offscreen"),
+}
+
+
+# --- Démarrage -------------------------------------------------------------
+_STARTUP_PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import mefu
+{extra}
+elapsed = time.perf_counter() - t0
+heavy = [m for m in ("cv2", "mediapipe", "sounddevice", "vosk") if m in sys.modules]
+print(json.dumps({{
+    "import_s": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    "heavy_modules": heavy,
+}}))
+"""
+
+STARTUP_VARIANTS = {
+    # Chemin menu seul : Kivy / KivyMD uniquement
+    "menu_only": "",
+    # Ancien comportement : tous les backends chargés à l'import
+    # (ceux qui ne sont pas installés sont absents de heavy_modules)
+    "eager_backends": (
+        "for name in ('cv2', 'mediapipe', 'sounddevice', 'vosk'):\n"
+        "    try:\n"
+        "        mefu._load_backend(name)\n"
+        "    except ImportError:\n"
+        "        pass"
+    ),
+}
+
+
+def _run_probe(code):
+    env = dict(os.environ)
+    env.update(BENCH_ENV)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=HERE, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench_startup(args):
+    """Médiane du temps d'import et de la RSS max, chaque mesure dans un processus neuf."""
+    results = {}
+    for variant, extra in STARTUP_VARIANTS.items():
+        code = _STARTUP_PROBE.format(extra=extra)
+        runs = [_run_probe(code) for _ in range(args.repeat)]
+        results[variant] = {
+            "import_s": statistics.median(r["import_s"] for r in runs),
+            "max_rss_mb": statistics.median(r["max_rss_mb"] for r in runs),
+            "heavy_modules": runs[-1]["heavy_modules"],
+        }
+    return results
+
+
+# --- MeFu sans affichage ------------------------------------------------------
+def headless_mefu(menu_config=None, **kwargs):
+    """mefu.headless_mefu, après avoir fixé l'environnement hors écran (BENCH_ENV)."""
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    import mefu
+
+    return mefu.headless_mefu(menu_config, **kwargs)
+
+
+# --- Gestes (rejeu d'enregistrements) ----------------------------------------
+def bench_gestures(args):
+    """Coût par image et précision du GestureRecognizer sur un enregistrement."""
+    import mefu_gestures as mg
+
+    recording, labels = args.recording, None
+    if recording is None:
+        recording = os.path.join(tempfile.mkdtemp(prefix="mefu-bench-"), "synthetic.mflm")
+        labels = mg.synthetic_landmarks(recording)
+    if args.labels:
+        labels = mg.load_labels(args.labels)
+
+    callback = None
+    if args.mefu:
+        mefu = headless_mefu()
+        callback = mefu.gesture_callback
+    results = {}
+    for _ in range(args.repeat):
+        events, stats = mg.replay(recording, gesture_callback=callback)
+        results = stats if not results or stats["recognize_mean_us"] < results["recognize_mean_us"] else results
+
+    # Variante vectorisée (grandeurs calculées en une passe NumPy)
+    header, times, points = mg.load_landmarks(recording)
+    t0 = time.perf_counter()
+    mg.GestureRecognizer().recognize_batch(points, times, header["frame_width"], header["frame_height"])
+    results["batch_per_frame_us"] = 1e6 * (time.perf_counter() - t0) / max(1, len(times))
+    if labels is not None:
+        results["accuracy"] = mg.score_events(events, labels)
+    return results
+
+
+def _recording_or_synthetic(args):
+    import mefu_gestures as mg
+
+    if args.recording:
+        return args.recording
+    path = os.path.join(tempfile.mkdtemp(prefix="mefu-bench-"), "synthetic.mflm")
+    mg.synthetic_landmarks(path)
+    return path
+
+
+def bench_smoothing(args):
+    """
+    Surcoût par image du LandmarkFilter (21 landmarks, une opération NumPy)
+    et tremblement du curseur (déplacement moyen de l'index d'une image à
+    l'autre, en px) avec / sans lissage.
+    """
+    import numpy as np
+    import mefu_gestures as mg
+
+    header, times, points = mg.load_landmarks(_recording_or_synthetic(args))
+    present = ~np.isnan(points[:, 0, 0])
+    frames, stamps = points[present], times[present]
+    best = None
+    for _ in range(args.repeat):
+        flt = mg.LandmarkFilter()
+        t0 = time.perf_counter()
+        for i in range(len(frames)):
+            flt(frames[i], float(stamps[i]))
+        elapsed = (time.perf_counter() - t0) / max(1, len(frames))
+        best = elapsed if best is None else min(best, elapsed)
+    smoothed = mg.LandmarkFilter().apply_batch(frames, stamps)
+    scale = np.array([header["frame_width"], header["frame_height"]], dtype=np.float32)
+
+    def jitter(stream):
+        index = stream[:, mg.INDEX_FINGER_TIP, :] * scale
+        return float(np.mean(np.linalg.norm(np.diff(index, axis=0), axis=-1))) if len(index) > 1 else 0.0
+
+    return {
+        "frames": int(len(frames)),
+        "filter_per_frame_us": 1e6 * best,
+        "cursor_jitter_raw_px": jitter(frames),
+        "cursor_jitter_smoothed_px": jitter(smoothed),
+    }
+
+
+def bench_hands(args):
+    """
+    Coût par image du HandTracker (appariement, grandeurs en une passe,
+    recognizer par main) pour 1 à `max_hands` mains, sur l'enregistrement
+    (synthétique par défaut) dont la main est dupliquée et décalée.
+    """
+    import numpy as np
+    import mefu_gestures as mg
+
+    header, times, points = mg.load_landmarks(_recording_or_synthetic(args))
+    present = ~np.isnan(points[:, 0, 0])
+    frames, stamps = points[present], times[present]
+    width, height = header["frame_width"], header["frame_height"]
+    results = {}
+    for count in range(1, args.max_hands + 1):
+        offsets = [np.array([(i - (count - 1) / 2) * 0.2, 0.0], dtype=np.float32) for i in range(count)]
+        best = None
+        for _ in range(args.repeat):
+            tracker = mg.HandTracker(max_hands=count)
+            t0 = time.perf_counter()
+            for i in range(len(frames)):
+                tracker.update([frames[i] + offset for offset in offsets], None, width, height, float(stamps[i]))
+            elapsed = (time.perf_counter() - t0) / max(1, len(frames))
+            best = elapsed if best is None else min(best, elapsed)
+        results[f"{count}_hands_us"] = 1e6 * best
+    return results
+
+
+# --- Détecteurs de gestes (GestureBackend) ------------------------------------
+def synthetic_video(frames=300, width=640, height=480, fps=30.0, seed=0):
+    """
+    Images BGR (déjà en miroir) : une main couleur peau sur fond gris qui,
+    par cycles de 3 s, glisse vers la droite puis monte. Générées à la volée :
+    itérateur de (t, image).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    background = rng.integers(60, 100, size=(height, width, 3), dtype=np.uint8)
+    side = height // 4
+    yy, xx = np.mgrid[0:side, 0:side]
+    inside = ((xx - side / 2) / (side / 2.4)) ** 2 + ((yy - side / 2) / (side / 2)) ** 2 <= 1.0
+    skin = (np.array([120, 150, 210], dtype=np.int16) + rng.integers(-15, 15, size=(side, side, 3))).clip(0, 255)
+    skin = skin.astype(np.uint8)
+    for i in range(frames):
+        t = i / fps
+        phase = t % 3.0
+        x, y = 0.3, 0.6
+        if 1.0 <= phase < 1.3:
+            x += (phase - 1.0) / 0.3 * 0.35
+        elif phase >= 1.3:
+            x += 0.35
+        if 2.0 <= phase < 2.3:
+            y -= (phase - 2.0) / 0.3 * 0.35
+        elif phase >= 2.3:
+            y -= 0.35
+        frame = background.copy()
+        x0 = int(x * width - side / 2)
+        y0 = int(y * height - side / 2)
+        region = frame[y0:y0 + side, x0:x0 + side]
+        region[inside] = skin[inside]
+        yield t, frame
+
+
+def bench_backends(args):
+    """
+    Pour chaque détecteur de GESTURE_BACKENDS : temps de chargement, latence
+    et CPU (thread_time) par image, y compris le HandTracker pour les
+    détecteurs à landmarks, et gestes détectés sur la vidéo synthétique. Un
+    détecteur dont les dépendances manquent est signalé sans interrompre les
+    autres.
+    """
+    import mefu
+    import mefu_gestures as mg
+
+    results = {}
+    for name in mefu.GESTURE_BACKENDS:
+        t0 = time.perf_counter()
+        try:
+            backend = mefu._make_gesture_backend(name, max_num_hands=1, inference_width=None)
+        except Exception as exc:
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+            continue
+        load_s = time.perf_counter() - t0
+        tracker = mg.HandTracker(max_hands=1)
+        wall, cpu = [], []
+        events = {gesture: 0 for gesture in mg.GESTURES}
+        for t, frame in synthetic_video(args.frames):
+            w0, c0 = time.perf_counter(), time.thread_time()
+            if "landmarks" in backend.capabilities:
+                hands, handedness = backend.landmarks(frame, None)
+                frame_events = tracker.update(hands, handedness, frame.shape[1], frame.shape[0], t)
+            else:
+                frame_events = backend.gestures(frame, t) or []
+            wall.append(time.perf_counter() - w0)
+            cpu.append(time.thread_time() - c0)
+            for gesture, pos, select in frame_events:
+                events[gesture] = events.get(gesture, 0) + 1
+        backend.close()
+        wall.sort()
+        results[name] = {
+            "capabilities": sorted(backend.capabilities),
+            "load_s": load_s,
+            "frame_p50_ms": 1e3 * percentile(wall, 50),
+            "frame_p95_ms": 1e3 * percentile(wall, 95),
+            "cpu_per_frame_ms": 1e3 * statistics.mean(cpu),
+            "events": events,
+        }
+    return results
+
+
+# --- Endurance (ouverture / fermeture) ---------------------------------------
+SOAK_MENU = {"menu": {"items": [
+    {"name": "Action", "icon": "circle", "handler": "act"},
+    {"name": "Sous-menu", "icon": "folder", "children": [
+        {"name": f"Sub {i}", "icon": "circle", "handler": f"sub{i}"} for i in range(6)
+    ]},
+]}}
+
+
+def bench_soak(args):
+    """
+    `cycles` fois : ouverture, entrée dans le sous-menu, retour, fermeture.
+    À intervalles réguliers : nombre d'observateurs Window.on_touch_down,
+    coût moyen d'un touch hors menu (menu fermé) et mémoire Python allouée
+    (tracemalloc). Les trois doivent rester plats.
+    """
+    import tracemalloc
+    from kivy.core.window import Window
+
+    mefu = headless_mefu(SOAK_MENU)
+    submenu = mefu.menu_root.children[1]
+    touch = mefu.FakeTouch((1, 1))
+
+    def touch_cost(n=200):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            Window.dispatch("on_touch_down", touch)
+        return 1e6 * (time.perf_counter() - t0) / n
+
+    tracemalloc.start()
+    checkpoints = []
+    step = max(1, args.cycles // 10)
+    for cycle in range(args.cycles + 1):
+        if cycle % step == 0:
+            gc.collect()
+            checkpoints.append({
+                "cycle": cycle,
+                "touch_observers": len(Window.get_property_observers("on_touch_down")),
+                "touch_dispatch_us": touch_cost(),
+                "traced_kb": tracemalloc.get_traced_memory()[0] / 1024.0,
+            })
+        if cycle == args.cycles:
+            break
+        mefu.show_menu((200, 400))
+        mefu._enter_node(submenu)
+        mefu._go_back()
+        mefu._close_menu(mefu)
+    tracemalloc.stop()
+    first, last = checkpoints[0], checkpoints[-1]
+    return {
+        "cycles": args.cycles,
+        "touch_observers_growth": last["touch_observers"] - first["touch_observers"],
+        "traced_kb_growth": last["traced_kb"] - checkpoints[1]["traced_kb"] if len(checkpoints) > 1 else 0.0,
+        "checkpoints": checkpoints,
+    }
+
+
+# --- Chemins critiques du menu (sans affichage) -------------------------------
+HOTPATH_SIZES = (8, 50, 200, 2000)
+HOTPATH_DEPTHS = (1, 3)
+
+
+def tree_menu(size, depth):
+    """`size` items par niveau ; le premier item de chaque niveau ouvre le suivant."""
+    def level(d):
+        items = [{"name": f"L{d} item {i}", "icon": "circle", "handler": f"h{i}"} for i in range(size)]
+        if d < depth:
+            items[0] = {"name": f"L{d} sous-menu", "icon": "folder", "children": level(d + 1)}
+        return items
+
+    return {"menu": {"items": level(1)}}
+
+
+def _timings_ms(samples):
+    samples = sorted(samples)
+    return {
+        "p50_ms": 1e3 * percentile(samples, 50),
+        "p95_ms": 1e3 * percentile(samples, 95),
+    }
+
+
+def _settle(seconds=0.8):
+    """
+    Fait tourner l'horloge Kivy (animations, mises en page) pendant `seconds`,
+    comptées après la première image : celle-ci construit les vues d'un
+    niveau virtualisé et peut à elle seule durer plus que `seconds`.
+    """
+    from kivy.clock import Clock
+
+    Clock.tick()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        Clock.tick()
+        time.sleep(1.0 / 120)
+
+
+class _BenchPipeline:
+    """
+    Pipeline factice (pipeline_factory de GestureService) pour CameraWidget :
+    une nouvelle image synthétique par appel.
+    """
+
+    def __init__(self, dispatch, device=None, width=640, height=480, count=8):
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8) for _ in range(count)]
+        self.frame_id = 0
+        self.capture = None
+        self.mp_hands = None
+        self.capabilities = frozenset()
+
+    def latest_frame(self):
+        self.frame_id += 1
+        return self.frame_id, self.frames[self.frame_id % len(self.frames)]
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_menu_open(self, menu_open):
+        pass
+
+    def cpu_stats(self):
+        return {}
+
+
+def _bench_camera_update(iterations):
+    """CameraWidget.update sur images 640x480 (capture simulée, texture réelle)."""
+    from mefu import MeFu
+
+    widget = MeFu.CameraWidget(None, gesture_options={"device": "bench", "pipeline_factory": _BenchPipeline})
+    try:
+        widget._update_event.cancel()
+        widget.update(0)
+        samples = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            widget.update(0)
+            samples.append(time.perf_counter() - t0)
+    finally:
+        widget.stop()
+    return _timings_ms(samples)
+
+
+def _prefetched_hops(mefu, pos, iterations):
+    """
+    Entrée dans un sous-menu dont la préconstruction a produit toutes ses
+    cartes sans avoir été finalisée (budget épuisé sur la dernière) : le
+    saut doit reprendre le layout déjà construit.
+    """
+    samples = []
+    submenu = mefu.menu_root.children[0]
+    steps = 1 if mefu._level_is_virtual(submenu) else len(submenu.children) + 1
+    mefu.PREFETCH_BUDGET = 0
+    try:
+        for _ in range(iterations):
+            mefu.invalidate_menu_cache()
+            mefu.show_menu(pos)
+            mefu._prefetch_level(submenu)
+            for _ in range(steps):
+                mefu._prefetch_step(0)
+            t0 = time.perf_counter()
+            mefu._enter_node(submenu)
+            samples.append(time.perf_counter() - t0)
+            mefu._cleanup_menu()
+    finally:
+        del mefu.PREFETCH_BUDGET
+    return samples
+
+
+def _hidden_after_open(mefu, pos, opens=4):
+    """
+    Lignes restées transparentes une fois l'animation d'ouverture terminée,
+    sur plusieurs ouvertures à froid (le nombre de vues recyclées déjà
+    construites au début de l'animation varie d'une ouverture à l'autre).
+    """
+    hidden = 0
+    for _ in range(opens):
+        mefu.invalidate_menu_cache()
+        mefu.show_menu(pos)
+        _settle(0.5)
+        hidden += sum(1 for row in mefu._visible_rows() if row.opacity < 1)
+        mefu._cleanup_menu()
+    return hidden
+
+
+def bench_hotpaths(args):
+    """
+    Ouverture du menu à froid (cache des niveaux vidé) et à chaud, selon la
+    taille des niveaux et la profondeur ; entrée dans un sous-menu (à froid et
+    après une préconstruction interrompue sur sa dernière carte) et retour ;
+    coût d'un gesture_callback("navigate") par image ; CameraWidget.update.
+    """
+    mefu = headless_mefu()
+    pos = (200, 400)
+    results = {"open": {}, "hop": {}, "hop_prefetched": {}, "back": {}}
+    for depth in HOTPATH_DEPTHS:
+        for size in HOTPATH_SIZES:
+            key = f"{size}x{depth}"
+            mefu.set_menu_config(tree_menu(size, depth))
+            cold, warm = [], []
+            for _ in range(args.iterations):
+                mefu.invalidate_menu_cache()
+                t0 = time.perf_counter()
+                mefu.show_menu(pos)
+                cold.append(time.perf_counter() - t0)
+                mefu._cleanup_menu()
+                t0 = time.perf_counter()
+                mefu.show_menu(pos)
+                warm.append(time.perf_counter() - t0)
+                mefu._cleanup_menu()
+            results["open"][key] = {"cold": _timings_ms(cold), "warm": _timings_ms(warm)}
+            if depth == 1:
+                continue
+            hops, backs = [], []
+            mefu.show_menu(pos)
+            submenu = mefu.menu_root.children[0]
+            for _ in range(args.iterations):
+                t0 = time.perf_counter()
+                mefu._enter_node(submenu)
+                t1 = time.perf_counter()
+                mefu._go_back()
+                hops.append(t1 - t0)
+                backs.append(time.perf_counter() - t1)
+            mefu._cleanup_menu()
+            results["hop"][key] = _timings_ms(hops)
+            results["back"][key] = _timings_ms(backs)
+            results["hop_prefetched"][key] = _timings_ms(_prefetched_hops(mefu, pos, args.iterations))
+
+    # navigate : balayage vertical du menu ouvert et mis en page, une image par appel ;
+    # une fois l'ouverture terminée, toutes les lignes affichées doivent être opaques
+    navigate = {}
+    for size in (8, 200):
+        mefu.set_menu_config(tree_menu(size, 1))
+        hidden = _hidden_after_open(mefu, pos)
+        if hidden:
+            results.setdefault("failures", []).append(f"{size}x1 : {hidden} ligne(s) invisible(s) après l'ouverture")
+        mefu.show_menu(pos)
+        _settle()
+        card = mefu.menu_card
+        x = card.center_x
+        ys = [card.y + card.height * (i + 0.5) / 64 for i in range(64)]
+        samples = []
+        for i in range(max(args.iterations, 10) * 20):
+            t0 = time.perf_counter()
+            mefu.gesture_callback("navigate", (x, ys[i % len(ys)]), False)
+            samples.append(time.perf_counter() - t0)
+        mefu._cleanup_menu()
+        navigate[f"{size}x1"] = {k.replace("_ms", "_us"): 1e3 * v for k, v in _timings_ms(samples).items()}
+    results["navigate"] = navigate
+    results["camera_update"] = _bench_camera_update(max(args.iterations, 10) * 4)
+    return results
+
+
+# --- Référence (détection de régressions) -------------------------------------
+TIME_SUFFIXES = ("_s", "_ms", "_us")
+TAIL_PREFIXES = ("p95", "p99", "max")
+
+
+def _flatten(result, prefix=""):
+    """{"a": {"b_ms": 1}} -> {"a.b_ms": 1}, temps uniquement."""
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and key.endswith(TIME_SUFFIXES):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_baseline(result, baseline, tolerance=0.25):
+    """
+    Temps plus lents que la référence de plus de `tolerance` (relatif).
+    Les queues de distribution (p95, p99, max) sont rapportées mais pas
+    comparées, ni les écarts de moins de 50 µs : trop sensibles au bruit.
+    """
+    floors = {"_s": 50e-6, "_ms": 0.05, "_us": 50.0}
+    current, reference = _flatten(result), _flatten(baseline)
+    regressions = {}
+    for name, value in current.items():
+        ref = reference.get(name)
+        if ref is None or name.rsplit(".", 1)[-1].startswith(TAIL_PREFIXES):
+            continue
+        floor = next(f for suffix, f in floors.items() if name.endswith(suffix))
+        if value > ref * (1 + tolerance) and value - ref > floor:
+            regressions[name] = {"baseline": ref, "current": value, "ratio": value / ref if ref else None}
+    return regressions
+
+
+# --- Recherche ---------------------------------------------------------------
+SEARCH_WORDS = ("fichier", "édition", "affichage", "outils", "réglages", "export", "image",
+                "calque", "filtre", "couleur", "texte", "forme", "aide", "fenêtre", "projet")
+SEARCH_QUERIES = ("exp", "calque", "reglages coul", "filtr imag", "fentre", "coleur", "zzz")
+
+
+def search_menu(nodes, fanout=40):
+    """Arbre généré d'environ `nodes` nœuds, noms composés de SEARCH_WORDS."""
+    words = SEARCH_WORDS
+    count = [0]
+
+    def level(depth):
+        items = []
+        for i in range(fanout):
+            if count[0] >= nodes:
+                break
+            count[0] += 1
+            name = f"{words[(i + depth) % len(words)]} {words[(i * 7 + depth * 3) % len(words)]} {count[0]}"
+            if depth < 2 and count[0] + fanout <= nodes:
+                items.append({"name": name, "icon": "folder", "children": level(depth + 1)})
+            else:
+                items.append({"name": name, "icon": "circle", "handler": "h"})
+        return items
+
+    return {"menu": {"items": level(0)}}
+
+
+def bench_search(args):
+    """Temps de construction du MenuSearchIndex et p50 / p99 par requête."""
+    from mefu import compile_menu, MenuSearchIndex
+
+    root, _ = compile_menu(search_menu(args.nodes))
+    t0 = time.perf_counter()
+    index = MenuSearchIndex(root)
+    build_s = time.perf_counter() - t0
+    queries = {}
+    for query in SEARCH_QUERIES:
+        samples = []
+        for _ in range(max(20, args.repeat * 20)):
+            t0 = time.perf_counter()
+            hits = index.search(query)
+            samples.append(1e3 * (time.perf_counter() - t0))
+        samples.sort()
+        queries[query] = {
+            "hits": len(hits),
+            "p50_ms": percentile(samples, 50),
+            "p99_ms": percentile(samples, 99),
+        }
+    return {"nodes": len(index.nodes), "build_s": build_s, "queries": queries}
+
+
+BENCHES = {
+    "startup": bench_startup,
+    "gestures": bench_gestures,
+    "smoothing": bench_smoothing,
+    "hands": bench_hands,
+    "backends": bench_backends,
+    "soak": bench_soak,
+    "search": bench_search,
+    "hotpaths": bench_hotpaths,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks MeFu")
+    parser.add_argument("bench", choices=sorted(BENCHES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--recording", help="enregistrement de landmarks (.mflm) ; synthétique par défaut")
+    parser.add_argument("--labels", help="annotations JSON [{\"t\": ..., \"gesture\": ...}]")
+    parser.add_argument("--mefu", action="store_true", help="rejoue aussi vers MeFu.gesture_callback")
+    parser.add_argument("--max-hands", type=int, default=4, help="hands : nombre de mains max")
+    parser.add_argument("--frames", type=int, default=300, help="backends : images synthétiques")
+    parser.add_argument("--cycles", type=int, default=5000, help="soak : nombre d'ouvertures / fermetures")
+    parser.add_argument("--nodes", type=int, default=65000, help="search : taille de l'arbre généré")
+    parser.add_argument("--iterations", type=int, default=50, help="hotpaths : mesures par chemin")
+    parser.add_argument("--baseline", help="référence JSON à comparer (code de sortie 1 si régression)")
+    parser.add_argument("--save-baseline", help="enregistre le résultat comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="régression au-delà de +25 %% par défaut")
+    args = parser.parse_args(argv)
+    result = BENCHES[args.bench](args)
+    status = 1 if result.get("failures") else 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get(args.bench)
+        if baseline is None:
+            print(f"{args.baseline} : pas de référence pour {args.bench}", file=sys.stderr)
+        else:
+            regressions = compare_baseline(result, baseline, args.tolerance)
+            result = {"result": result, "regressions": regressions}
+            status = 1 if regressions or status else 0
+    if args.save_baseline:
+        stored = {}
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        stored[args.bench] = result.get("result", result) if args.baseline else result
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2)
+    print(json.dumps(result, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
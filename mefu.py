@@ -1,9 +1,15 @@
 
 import os
 import json
+import re
+import importlib
+import inspect
+import sys
+from bisect import bisect_left, bisect_right
 import threading
 import time
 import subprocess
+import unicodedata
 from datetime import datetime
 from pathlib import Path
 
@@ -20,14 +26,14 @@ from kivy.uix.boxlayout     import BoxLayout
 from kivy.uix.label         import Label
 from kivy.uix.image         import Image
 from kivy.uix.filechooser   import FileChooserIconView
+from kivy.uix.recycleview   import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.behaviors     import DragBehavior
 from kivy.input.motionevent import MotionEvent
 from kivy.graphics          import Color, RoundedRectangle, Rectangle, ScissorPush, ScissorPop
 from kivy.graphics.texture  import Texture
 
-import cv2
-import mediapipe as mp
-
 # KivyMD ---------------------------------------------------------------------
 from kivymd.app          import MDApp
 from kivymd.uix.boxlayout import MDBoxLayout
@@ -41,51 +47,1698 @@ from kivymd.uix.list      import MDList, OneLineListItem
 
 from kivymd.toast         import toast
 
-# --- Vosk (speech) ----------------------------------------------------------
 import queue
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+from collections import defaultdict, deque
+
+from mefu_stats import percentile
+
+# --- Backends optionnels (chargés au premier usage) -------------------------
+# cv2 / mediapipe / sounddevice / vosk coûtent plusieurs secondes et des
+# centaines de Mo à l'import : ils ne sont chargés que lorsqu'un CameraWidget
+# est construit ou que la reconnaissance vocale est activée. Le chemin
+# "menu seul" n'importe ainsi que Kivy / KivyMD.
+_BACKENDS = {}
+
+
+def _load_backend(name):
+    module = _BACKENDS.get(name)
+    if module is None:
+        try:
+            module = importlib.import_module(name)
+        except ImportError as exc:
+            raise ImportError(
+                f"MeFu : le module optionnel '{name}' est requis pour cette fonctionnalité "
+                f"(pip install -r requirements.txt) : {exc}"
+            ) from exc
+        _BACKENDS[name] = module
+    return module
+
+
+def _cv2():
+    return _load_backend("cv2")
+
+
+def _numpy():
+    return _load_backend("numpy")
+
+
+def _mediapipe():
+    return _load_backend("mediapipe")
+
+
+def _sounddevice():
+    return _load_backend("sounddevice")
+
+
+def _vosk():
+    # vosk expose Model / KaldiRecognizer
+    return _load_backend("vosk")
+
+
+def _yaml():
+    # PyYAML, uniquement pour les fichiers de menu .yaml / .yml
+    return _load_backend("yaml")
+
+
+def _gestures():
+    # Reconnaissance / enregistrement des landmarks (dépend de numpy)
+    return _load_backend("mefu_gestures")
+
+
+def _trace():
+    # Journal d'interactions binaire (mmap)
+    return _load_backend("mefu_trace")
+
+# --- Instrumentation de latence (optionnelle) --------------------------------
+class LatencyMonitor:
+    """
+    Histogrammes glissants (les `window` dernières mesures) des étapes d'un
+    geste, de l'image caméra à la surbrillance, en secondes :
+
+    - "capture"     : décodage de l'image (retrieve) dans le thread de capture ;
+    - "queue"       : attente de l'image dans la file avant l'inférence ;
+    - "inference"   : retournement + MediaPipe (hands.process) ;
+    - "recognition" : HandTracker.update (recognizers des mains visibles) ;
+    - "dispatch"    : publication -> exécution sur le thread Kivy (Clock) ;
+    - "callback"    : durée de MeFu.gesture_callback ;
+    - "highlight"   : bout en bout, image capturée -> md_bg_color appliqué ;
+    - "menu_open"   : ouverture demandée -> début de l'animation.
+
+    Un seul moniteur par processus (voir enable_latency_monitor) ; désactivé,
+    l'instrumentation se réduit à un test `is None` par étape.
+    """
+
+    STAGES = ("capture", "queue", "inference", "recognition",
+              "dispatch", "callback", "highlight", "menu_open")
+
+    def __init__(self, window=512):
+        self.window = window
+        self._samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+        # Horodatage de capture de l'image dont l'événement est en cours de livraison
+        self.frame_stamp = None
+
+    def record(self, stage, seconds):
+        # deque.append est atomique : appelable depuis les threads du pipeline
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples.setdefault(stage, deque(maxlen=self.window))
+        samples.append(seconds)
+
+    def record_since_frame(self, stage):
+        """Mesure bout en bout depuis la capture de l'image en cours de livraison."""
+        if self.frame_stamp is not None:
+            self.record(stage, time.perf_counter() - self.frame_stamp)
+
+    def stats(self):
+        """{étape: {"count", "p50_ms", "p95_ms", "p99_ms", "max_ms"}} des étapes mesurées."""
+        result = {}
+        for stage, samples in list(self._samples.items()):
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            result[stage] = {
+                "count": len(ordered),
+                "p50_ms": 1000.0 * percentile(ordered, 50),
+                "p95_ms": 1000.0 * percentile(ordered, 95),
+                "p99_ms": 1000.0 * percentile(ordered, 99),
+                "max_ms": 1000.0 * ordered[-1],
+            }
+        return result
+
+    def summary(self):
+        """Une ligne par étape (affichage de l'overlay)."""
+        lines = []
+        for stage, s in self.stats().items():
+            lines.append(f"{stage:<12}{s['p50_ms']:7.1f}{s['p95_ms']:7.1f}{s['p99_ms']:7.1f} ms")
+        return "\n".join([f"{'':<12}{'p50':>7}{'p95':>7}{'p99':>7}"] + lines) if lines else ""
+
+    def reset(self):
+        for samples in self._samples.values():
+            samples.clear()
+
+
+_latency = None
+
+
+def enable_latency_monitor(window=512):
+    """Active l'instrumentation (processus entier) et renvoie le moniteur."""
+    global _latency
+    if _latency is None:
+        _latency = LatencyMonitor(window)
+    return _latency
+
+
+def disable_latency_monitor():
+    global _latency
+    _latency = None
+
+
+# --- Journal d'interactions (optionnel) ----------------------------------------
+# Un seul EventTracer (mefu_trace) par processus ; désactivé, chaque point de
+# trace se réduit à un test `is None`.
+_tracer = None
+
+
+def enable_event_tracer(path, capacity=65536, window_size=None):
+    """
+    Trace souris, ouvertures, gestes, actions et retours dans l'anneau
+    binaire `path` (voir mefu_trace : dump / summary / replay).
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = _trace().EventTracer(path, capacity=capacity,
+                                       window_size=window_size or Window.size)
+    return _tracer
+
+
+def disable_event_tracer():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+
+
+def event_tracer():
+    return _tracer
+
+
+def latency_monitor():
+    """Moniteur actif, ou None."""
+    return _latency
+
+
+# Politique de cadence de l'inférence (images / seconde par mode) :
+# - "menu"   : menu ouvert, navigation fine ;
+# - "active" : main vue il y a moins de `idle_after` secondes ;
+# - "idle"   : aucune main, simple contrôle de présence basse fréquence.
+DEFAULT_RATE_POLICY = {
+    "menu_fps": 30,
+    "active_fps": 30,
+    "idle_fps": 4,
+    "idle_after": 2.0,
+}
+
+
+# --- Détecteurs de mains interchangeables ------------------------------------
+class GestureBackend:
+    """
+    Détecteur utilisé par GesturePipeline dans son thread d'inférence, sur
+    l'image BGR déjà en miroir. Deux familles :
+
+    - à landmarks ("landmarks" dans `capabilities`) : landmarks(frame, box)
+      renvoie (mains (21, 2) normalisées, latéralités) ; les gestes sont
+      reconnus par le HandTracker ;
+    - à gestes directs : gestures(frame, now) renvoie une liste de
+      (gesture, pos, select) en pixels de l'image, ou None si aucune main.
+
+    `capabilities` déclare aussi les gestes fournis ("open_menu",
+    "swipe_right", "navigate", "select") et les options prises en charge
+    ("handedness", "multi_hand", "roi").
+    """
+
+    name = None
+    capabilities = frozenset()
+
+    def landmarks(self, frame, box):
+        raise NotImplementedError
+
+    def gestures(self, frame, now):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MediaPipeBackend(GestureBackend):
+    """MediaPipe Hands : 21 landmarks par main, tous les gestes (par défaut)."""
+
+    name = "mediapipe"
+    capabilities = frozenset({"landmarks", "handedness", "multi_hand", "roi",
+                              "open_menu", "swipe_right", "navigate", "select"})
+
+    def __init__(self, max_num_hands=1, inference_width=None,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        # Résolution d'inférence : largeur max de l'image passée à MediaPipe
+        # (None = pleine résolution). Les landmarks étant normalisés, la
+        # réduction ne change pas l'espace de coordonnées des gestes.
+        self.inference_width = inference_width
+        self.mp_hands = _mediapipe().solutions.hands
+        self.hands = self.mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence)
+
+    def landmarks(self, frame, box):
+        """
+        Landmarks des mains détectées, en coordonnées normalisées de l'image
+        complète (liste de tableaux (21, 2)), et leur latéralité ("Left" /
+        "Right", image déjà en miroir). `box` = (x0, y0, x1, y1) en pixels.
+        """
+        cv2 = _cv2()
+        if box is not None:
+            x0, y0, x1, y1 = box
+            src = frame[y0:y1, x0:x1]
+        else:
+            x0, y0 = 0, 0
+            src = frame
+        src_height, src_width = src.shape[:2]
+        if self.inference_width and src_width > self.inference_width:
+            scale = self.inference_width / src_width
+            src = cv2.resize(src, (self.inference_width, max(1, int(src_height * scale))),
+                             interpolation=cv2.INTER_AREA)
+        results = self.hands.process(cv2.cvtColor(src, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            return [], []
+        np = _numpy()
+        frame_height, frame_width = frame.shape[:2]
+        hands = []
+        for hand in results.multi_hand_landmarks:
+            points = np.array([(lm.x, lm.y) for lm in hand.landmark], dtype=np.float32)
+            # Recadrage -> image complète
+            points[:, 0] = (x0 + points[:, 0] * src_width) / frame_width
+            points[:, 1] = (y0 + points[:, 1] * src_height) / frame_height
+            hands.append(points)
+        handedness = [None] * len(hands)
+        for i, info in enumerate(results.multi_handedness or []):
+            if i < len(hands):
+                handedness[i] = info.classification[0].label
+        return hands, handedness
+
+    def close(self):
+        self.hands.close()
+
+
+class MotionBackend(GestureBackend):
+    """
+    Détecteur léger, OpenCV seul (sans MediaPipe), pour un usage par swipes :
+    la plus grande zone de peau (seuils YCrCb) est suivie par flux optique
+    (Lucas-Kanade sur ses points saillants), sur une image réduite à
+    `inference_width` px. Un déplacement cumulé sur `window` secondes de plus
+    de `swipe` (fraction de l'image) vers la droite donne "swipe_right", vers
+    le haut "open_menu". Ni curseur ni sélection.
+    """
+
+    name = "motion"
+    capabilities = frozenset({"open_menu", "swipe_right"})
+
+    def __init__(self, max_num_hands=1, inference_width=160, swipe=0.25, window=0.4, cooldown=0.8,
+                 min_area=0.01, skin_lower=(0, 133, 77), skin_upper=(255, 173, 127)):
+        cv2 = _cv2()
+        np = _numpy()
+        self.inference_width = inference_width or 160
+        self.swipe = swipe
+        self.window = window
+        self.cooldown = cooldown
+        self.min_area = min_area
+        self.skin_lower = np.array(skin_lower, dtype=np.uint8)
+        self.skin_upper = np.array(skin_upper, dtype=np.uint8)
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self._prev_gray = None
+        self._points = None
+        self._motion = deque()
+        self._last_gesture = 0.0
+
+    def gestures(self, frame, now):
+        cv2 = _cv2()
+        np = _numpy()
+        frame_height, frame_width = frame.shape[:2]
+        scale = min(1.0, self.inference_width / frame_width)
+        small = frame
+        if scale < 1.0:
+            small = cv2.resize(frame, (self.inference_width, max(1, int(frame_height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        height, width = small.shape[:2]
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        prev_gray, self._prev_gray = self._prev_gray, gray
+        mask = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb), self.skin_lower, self.skin_upper)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(mask)
+        if count < 2:
+            self._lost()
+            return None
+        blob = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        if stats[blob, cv2.CC_STAT_AREA] < self.min_area * width * height:
+            self._lost()
+            return None
+        if prev_gray is not None and self._points is not None:
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, self._points, None,
+                                                        winSize=(15, 15), maxLevel=2)
+            ok = status.reshape(-1) == 1
+            if ok.any():
+                dx, dy = np.median((moved - self._points).reshape(-1, 2)[ok], axis=0)
+                self._motion.append((now, dx / width, dy / height))
+        # Points suivis à l'image suivante : coins de la zone de peau
+        self._points = cv2.goodFeaturesToTrack(gray, maxCorners=30, qualityLevel=0.01, minDistance=5,
+                                               mask=(labels == blob).astype(np.uint8))
+        while self._motion and now - self._motion[0][0] > self.window:
+            self._motion.popleft()
+        events = []
+        if self._motion and now - self._last_gesture > self.cooldown:
+            dx = sum(m[1] for m in self._motion)
+            dy = sum(m[2] for m in self._motion)
+            cx, cy = centroids[blob]
+            pos = (int(cx / scale), frame_height - int(cy / scale))
+            if dx > self.swipe and dx > abs(dy):
+                events.append(("swipe_right", pos, False))
+            elif -dy > self.swipe and -dy > abs(dx):
+                events.append(("open_menu", pos, False))
+            if events:
+                self._last_gesture = now
+                self._motion.clear()
+        return events
+
+    def _lost(self):
+        self._points = None
+        self._motion.clear()
+
+
+# Détecteurs disponibles par nom (gesture_options={"backend": "motion"})
+GESTURE_BACKENDS = {
+    "mediapipe": MediaPipeBackend,
+    "motion": MotionBackend,
+}
+
+
+def register_gesture_backend(name, factory):
+    """
+    Ajoute un détecteur (ex. modèle de paume ONNX) : `factory(max_num_hands,
+    inference_width, **backend_options)` renvoie un GestureBackend.
+    """
+    GESTURE_BACKENDS[name] = factory
+
+
+def _make_gesture_backend(backend, **options):
+    if isinstance(backend, GestureBackend):
+        return backend
+    factory = GESTURE_BACKENDS.get(backend) if isinstance(backend, str) else backend
+    if factory is None:
+        raise ValueError(f"détecteur de gestes inconnu : {backend!r} ({', '.join(GESTURE_BACKENDS)})")
+    return factory(**options)
+
+
+class GesturePipeline:
+    """
+    Capture caméra + inférence (détecteur interchangeable, MediaPipe par
+    défaut) hors du thread Kivy.
+
+    - un thread de capture vide le tampon de la caméra en continu (grab) et
+      ne décode une image (retrieve) que lorsque l'inférence en demande une ;
+      elle est déposée dans une file bornée (taille 1, la plus récente gagne) ;
+    - un thread d'inférence consomme cette image, extrait les landmarks des
+      mains (jusqu'à `max_num_hands`) avec le détecteur `backend` (voir
+      GestureBackend), les passe au HandTracker (mefu_gestures :
+      un GestureRecognizer par main, gestes de la main principale selon
+      `primary_hand`, deux mains si `two_handed`) et publie l'image pour
+      l'aperçu, à une cadence adaptée au mode courant (voir
+      DEFAULT_RATE_POLICY) ; `record_path` enregistre en plus le flux de
+      landmarks pour rejeu hors ligne ; un détecteur à gestes directs
+      (ex. "motion") court-circuite le HandTracker ;
+    - seuls les événements de geste (open_menu, swipe_right, navigate) sont
+      ramenés sur le thread principal via Clock, les "navigate" successifs
+      étant fusionnés (seul le plus récent est livré).
+    """
+
+    MODES = ("menu", "active", "idle")
+
+    def __init__(self, on_gesture, device=0, rate_policy=None,
+                 inference_width=None, roi=False, roi_margin=0.35, roi_min_size=0.25,
+                 recognizer=None, record_path=None, max_num_hands=1, primary_hand="sticky",
+                 two_handed=False, backend="mediapipe", backend_options=None):
+        self.on_gesture = on_gesture
+        # Seuils des GestureRecognizer (ex. {"swipe_px": 60}), un par main suivie
+        self.max_num_hands = max_num_hands
+        self.tracker = _gestures().HandTracker(max_hands=max_num_hands, primary=primary_hand,
+                                               two_handed=two_handed, recognizer=recognizer)
+        self.record_path = record_path
+        self._recorder = None
+        self.inference_width = inference_width
+        # Mode ROI : on ne passe à MediaPipe qu'un carré autour de la dernière
+        # main vue (marge `roi_margin`, côté min `roi_min_size` de la hauteur),
+        # retour à l'image complète dès que la main est perdue.
+        self.roi = roi and "roi" in self.backend_capabilities(backend)
+        self.roi_margin = roi_margin
+        self.roi_min_size = roi_min_size
+        self._roi_box = None
+        self.rate_policy = dict(DEFAULT_RATE_POLICY)
+        if rate_policy:
+            self.rate_policy.update(rate_policy)
+        self.menu_open = False
+        self.mode = "idle"
+        self._last_hand_time = 0.0
+        self._want_frame = threading.Event()
+        self._wake = threading.Event()
+        # CPU (thread_time) / temps réel / images par mode ; le CPU des threads
+        # internes de MediaPipe n'est pas inclus.
+        self._stats = {mode: {"frames": 0, "inference_cpu_s": 0.0, "capture_cpu_s": 0.0, "wall_s": 0.0}
+                       for mode in self.MODES}
+        self.capture = _cv2().VideoCapture(device)
+        self.backend = _make_gesture_backend(backend, max_num_hands=max_num_hands,
+                                             inference_width=inference_width, **(backend_options or {}))
+        self.capabilities = self.backend.capabilities
+        self.mp_hands = getattr(self.backend, "mp_hands", None)
+
+        self._frames = queue.Queue(maxsize=1)
+        # Aperçu partagé : (numéro d'image, image) ; non consommé à la lecture
+        # pour que plusieurs widgets puissent afficher la même image
+        self._preview = (0, None)
+        self._running = threading.Event()
+        self._threads = []
+
+        self._lock = threading.Lock()
+        self._pending_events = []
+        self._pending_nav = None
+        self._flush_scheduled = False
+
+    @staticmethod
+    def backend_capabilities(backend):
+        if isinstance(backend, str):
+            backend = GESTURE_BACKENDS.get(backend)
+        return getattr(backend, "capabilities", frozenset())
+
+    # --- Cycle de vie -----------------------------------------------------
+    def start(self):
+        if self._running.is_set():
+            return
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="mefu-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="mefu-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        self._running.clear()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        try:
+            self.capture.release()
+        except Exception:
+            pass
+        try:
+            self.backend.close()
+        except Exception:
+            pass
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def set_menu_open(self, menu_open):
+        """Menu ouvert : pleine cadence immédiate (réveille l'inférence)."""
+        self.menu_open = bool(menu_open)
+        self._wake.set()
+
+    def cpu_stats(self):
+        """
+        Consommation par mode : images traitées, CPU des threads capture /
+        inférence, temps passé dans le mode et % d'un cœur.
+        """
+        report = {}
+        for mode, stats in self._stats.items():
+            cpu = stats["inference_cpu_s"] + stats["capture_cpu_s"]
+            wall = stats["wall_s"]
+            report[mode] = dict(stats, fps=stats["frames"] / wall if wall else 0.0,
+                                cpu_percent=100.0 * cpu / wall if wall else 0.0)
+        return report
+
+    def _current_mode(self, now):
+        if self.menu_open:
+            return "menu"
+        if now - self._last_hand_time < self.rate_policy["idle_after"]:
+            return "active"
+        return "idle"
+
+    def latest_frame(self):
+        """(numéro, dernière image traitée BGR en miroir horizontal) ; image None au départ."""
+        return self._preview
+
+    # --- Threads de travail ----------------------------------------------
+    def _capture_loop(self):
+        cpu_start = time.thread_time()
+        while self._running.is_set():
+            cpu_now = time.thread_time()
+            self._stats[self.mode]["capture_cpu_s"] += cpu_now - cpu_start
+            cpu_start = cpu_now
+            # grab() vide le tampon du pilote sans décoder ; on ne décode que sur demande
+            if not self.capture.grab():
+                time.sleep(0.01)
+                continue
+            if not self._want_frame.is_set():
+                continue
+            decode_start = time.perf_counter()
+            ret, frame = self.capture.retrieve()
+            if not ret:
+                continue
+            stamp = time.perf_counter()
+            monitor = _latency
+            if monitor is not None:
+                monitor.record("capture", stamp - decode_start)
+            self._want_frame.clear()
+            # File bornée : on jette l'image en attente si l'inférence est en retard
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._frames.put_nowait((stamp, frame))
+            except queue.Full:
+                pass
+
+    def _inference_loop(self):
+        cv2 = _cv2()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        while self._running.is_set():
+            tick = time.perf_counter()
+            self._want_frame.set()
+            try:
+                stamp, frame = self._frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            monitor = _latency
+            inference_start = time.perf_counter()
+            frame = cv2.flip(frame, 1)
+            frame_height, frame_width = frame.shape[:2]
+            box = self._roi_box if self.roi else None
+            direct = "landmarks" not in self.capabilities
+            if direct:
+                # Détecteur à gestes directs : None = aucune main à l'image
+                now = time.time()
+                events = self.backend.gestures(frame, now)
+                hands = []
+            else:
+                hands, handedness = self.backend.landmarks(frame, box)
+                now = time.time()
+            if monitor is not None:
+                inference_end = time.perf_counter()
+                monitor.record("queue", inference_start - stamp)
+                monitor.record("inference", inference_end - inference_start)
+            if not direct:
+                events = self.tracker.update(hands, handedness, frame_width, frame_height, now)
+                if hands and monitor is not None:
+                    monitor.record("recognition", time.perf_counter() - inference_end)
+            if hands or (direct and events is not None):
+                for gesture, pos, select in events:
+                    self._post(gesture, pos, select, stamp)
+                self._last_hand_time = now
+            if self.record_path and not direct:
+                if self._recorder is None:
+                    self._recorder = _gestures().LandmarkRecorder(self.record_path, frame_width, frame_height)
+                self._recorder.write(now, hands)
+            if self.roi:
+                # Recadrage seulement quand toutes les mains attendues sont
+                # visibles : sinon image complète, pour détecter les nouvelles
+                points = _numpy().concatenate(hands) if len(hands) >= self.max_num_hands else None
+                self._roi_box = self._next_roi(points, frame_width, frame_height)
+            self._preview = (self._preview[0] + 1, frame)
+
+            # Comptabilité par mode puis attente jusqu'au prochain créneau
+            stats = self._stats[self.mode]
+            stats["frames"] += 1
+            self.mode = self._current_mode(now)
+            fps = self.rate_policy[self.mode + "_fps"]
+            delay = 1.0 / fps - (time.perf_counter() - tick) if fps > 0 else 0.1
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+            wall_now = time.perf_counter()
+            cpu_now = time.thread_time()
+            stats["wall_s"] += wall_now - wall_start
+            stats["inference_cpu_s"] += cpu_now - cpu_start
+            wall_start, cpu_start = wall_now, cpu_now
+
+    def _next_roi(self, points, frame_width, frame_height):
+        """Fenêtre ROI de l'image suivante (pixels), None = image complète."""
+        if points is None:
+            return None
+        np = _numpy()
+        px = points[:, 0] * frame_width
+        py = points[:, 1] * frame_height
+        box = self._roi_box
+        if box is not None:
+            # Hystérésis : on garde la fenêtre tant que la main reste dans sa zone
+            # centrale, pour ne pas perturber le suivi interne de MediaPipe
+            x0, y0, x1, y1 = box
+            inset_x = (x1 - x0) * 0.15
+            inset_y = (y1 - y0) * 0.15
+            if (px.min() > x0 + inset_x and px.max() < x1 - inset_x and
+                    py.min() > y0 + inset_y and py.max() < y1 - inset_y):
+                return box
+        side = max(px.max() - px.min(), py.max() - py.min()) * (1 + 2 * self.roi_margin)
+        side = max(side, self.roi_min_size * frame_height)
+        side = min(side, frame_width, frame_height)
+        if side >= min(frame_width, frame_height):
+            return None
+        cx = (px.max() + px.min()) / 2
+        cy = (py.max() + py.min()) / 2
+        x0 = int(np.clip(cx - side / 2, 0, frame_width - side))
+        y0 = int(np.clip(cy - side / 2, 0, frame_height - side))
+        return (x0, y0, x0 + int(side), y0 + int(side))
+
+    # --- Retour sur le thread principal ----------------------------------
+    def _post(self, gesture, pos, select=False, stamp=None):
+        # stamp = capture de l'image source, posted = publication (instrumentation)
+        posted = time.perf_counter()
+        with self._lock:
+            if gesture == "navigate":
+                self._pending_nav = (pos, select, stamp, posted)
+            else:
+                self._pending_events.append((gesture, pos, stamp, posted))
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        Clock.schedule_once(self._flush_events)
+
+    def _flush_events(self, dt):
+        with self._lock:
+            events, self._pending_events = self._pending_events, []
+            nav, self._pending_nav = self._pending_nav, None
+            self._flush_scheduled = False
+        if not self._running.is_set():
+            return
+        monitor = _latency
+        for gesture, pos, stamp, posted in events:
+            self._deliver(monitor, stamp, posted, gesture, pos)
+        if nav is not None:
+            pos, select, stamp, posted = nav
+            self._deliver(monitor, stamp, posted, "navigate", pos, select)
+
+    def _deliver(self, monitor, stamp, posted, *event):
+        if monitor is None:
+            self.on_gesture(*event)
+            return
+        start = time.perf_counter()
+        monitor.record("dispatch", start - posted)
+        monitor.frame_stamp = stamp
+        try:
+            self.on_gesture(*event)
+        finally:
+            monitor.frame_stamp = None
+        monitor.record("callback", time.perf_counter() - start)
+
+
+class GestureService:
+    """
+    Capture + inférence partagées par toutes les instances MeFu d'un processus.
+
+    Un seul GesturePipeline (caméra + modèle) par périphérique, compté par
+    référence : acquire() démarre le pipeline au premier abonné, release()
+    l'arrête et libère caméra et modèle au départ du dernier. Les gestes sont
+    diffusés à tous les abonnés sur le thread Kivy ; la pleine cadence "menu"
+    est active dès qu'un abonné a son menu ouvert.
+
+    `pipeline_factory(dispatch, device=..., **options)` remplace
+    GesturePipeline (benchmarks, sources d'images simulées) ; il doit fournir
+    start / stop / set_menu_open / latest_frame / cpu_stats ainsi que les
+    attributs capture, mp_hands et capabilities lus par CameraWidget.
+    """
+
+    _services = {}
+    _lock = threading.Lock()
+
+    def __init__(self, device, pipeline_factory=None, **options):
+        self.device = device
+        self.options = options
+        self._subscribers = []
+        self._menu_open = set()
+        self.pipeline = (pipeline_factory or GesturePipeline)(self._dispatch, device=device, **options)
+
+    @classmethod
+    def acquire(cls, subscriber, device=0, pipeline_factory=None, **options):
+        """
+        Abonne `subscriber(gesture, pos, select=False)` au service du
+        périphérique ; `pipeline_factory` ne sert qu'à la création du service.
+        """
+        with cls._lock:
+            service = cls._services.get(device)
+            if service is None:
+                service = cls(device, pipeline_factory, **options)
+                cls._services[device] = service
+            elif options and options != service.options:
+                print(f"GestureService : caméra {device} déjà ouverte, options ignorées : {options}")
+            service._subscribers.append(subscriber)
+            if len(service._subscribers) == 1:
+                service.pipeline.start()
+        return service
+
+    def release(self, subscriber):
+        """Désabonne ; le dernier départ arrête le pipeline (caméra + modèle)."""
+        with GestureService._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            self._menu_open.discard(subscriber)
+            if self._subscribers:
+                self.pipeline.set_menu_open(bool(self._menu_open))
+                return
+            if GestureService._services.get(self.device) is self:
+                del GestureService._services[self.device]
+        self.pipeline.stop()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def set_menu_open(self, subscriber, menu_open):
+        if menu_open:
+            self._menu_open.add(subscriber)
+        else:
+            self._menu_open.discard(subscriber)
+        self.pipeline.set_menu_open(bool(self._menu_open))
+
+    def _dispatch(self, gesture, pos, select=False):
+        # Thread Kivy (appelé depuis GesturePipeline._flush_events)
+        for subscriber in list(self._subscribers):
+            subscriber(gesture, pos, select)
+
+
+class VoiceCommandEngine:
+    """
+    Commandes vocales Vosk, hors du thread Kivy :
+
+    - le modèle est chargé et le flux micro (sounddevice) ouvert dans un
+      thread dédié ; le callback audio ne fait que déposer le bloc dans une
+      file bornée (jamais bloquant : un bloc est perdu si la file est pleine) ;
+    - ce même thread passe les blocs à un KaldiRecognizer limité à une
+      grammaire (les phrases du niveau courant, voir set_vocabulary) ;
+    - chaque phrase reconnue est ramenée sur le thread Kivy via Clock et
+      livrée à `on_command(phrase)`.
+
+    Latences (LatencyMonitor propre au moteur, voir latency_stats) :
+    "recognition" = fin du bloc audio qui conclut la phrase -> résultat Vosk ;
+    "dispatch" = résultat -> exécution sur le thread Kivy.
+    """
+
+    def __init__(self, on_command, model_path=None, device=None, samplerate=16000,
+                 blocksize=4000, max_blocks=50, partial=False):
+        self.on_command = on_command
+        self.model_path = str(model_path or Path(__file__).resolve().parent / "models" / "vosk")
+        self.device = device
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        # Réagir dès qu'un résultat partiel correspond exactement à une phrase
+        # (plus réactif, sans attendre le silence de fin d'énoncé)
+        self.partial = partial
+        self.latency = LatencyMonitor(window=128)
+        self.dropped_blocks = 0
+        self._blocks = queue.Queue(maxsize=max_blocks)
+        self._phrases = frozenset()
+        self._grammar = None
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._running.is_set():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._recognition_loop, name="mefu-voice", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def set_vocabulary(self, phrases):
+        """Grammaire du recognizer (remplacée au prochain bloc audio)."""
+        phrases = sorted(set(p for p in phrases if p))
+        self._phrases = frozenset(phrases)
+        self._grammar = json.dumps(phrases + ["[unk]"], ensure_ascii=False)
+
+    def latency_stats(self):
+        return self.latency.stats()
+
+    def _audio_callback(self, data, frames, time_info, status):
+        # Thread PortAudio : aucune attente, aucun traitement
+        try:
+            self._blocks.put_nowait((time.perf_counter(), bytes(data)))
+        except queue.Full:
+            self.dropped_blocks += 1
+
+    def _recognition_loop(self):
+        try:
+            vosk = _vosk()
+            sounddevice = _sounddevice()
+            vosk.SetLogLevel(-1)
+            model = vosk.Model(self.model_path)
+            stream = sounddevice.RawInputStream(
+                samplerate=self.samplerate, blocksize=self.blocksize, device=self.device,
+                dtype="int16", channels=1, callback=self._audio_callback,
+            )
+        except Exception as exc:
+            print(f"VoiceCommandEngine : démarrage impossible : {exc}")
+            self._running.clear()
+            return
+        recognizer, grammar = None, None
+        with stream:
+            while self._running.is_set():
+                try:
+                    stamp, data = self._blocks.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if grammar is not self._grammar:
+                    grammar = self._grammar
+                    recognizer = vosk.KaldiRecognizer(model, self.samplerate, grammar) if grammar else None
+                if recognizer is None:
+                    continue
+                if recognizer.AcceptWaveform(data):
+                    text = json.loads(recognizer.Result()).get("text", "")
+                elif self.partial:
+                    text = json.loads(recognizer.PartialResult()).get("partial", "")
+                    if text not in self._phrases:
+                        continue
+                    recognizer.Reset()
+                else:
+                    continue
+                if text and text in self._phrases:
+                    recognized = time.perf_counter()
+                    self.latency.record("recognition", recognized - stamp)
+                    Clock.schedule_once(lambda dt, t=text, r=recognized: self._deliver(t, r))
+
+    def _deliver(self, phrase, recognized):
+        if not self._running.is_set():
+            return
+        self.latency.record("dispatch", time.perf_counter() - recognized)
+        self.on_command(phrase)
+
+
+def voice_phrase(name):
+    """Forme parlée d'un libellé : minuscules, sans ponctuation ni espaces multiples."""
+    return " ".join(re.sub(r"[^\w\s'-]", " ", name.lower()).split())
+
+
+class ActionTask:
+    """
+    Action lancée en arrière-plan. `state` : pending (en file), running,
+    done, failed ou cancelled ; `result` / `error` sont renseignés sur le
+    thread Kivy, juste avant l'appel de on_done / on_error.
+    """
+
+    def __init__(self, executor, name, func, args, kwargs, on_done, on_error):
+        self.executor = executor
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.state = "pending"
+        self.result = None
+        self.error = None
+        self._future = None
+
+    @property
+    def done(self):
+        return self.state in ("done", "failed", "cancelled")
+
+    def cancel(self):
+        return self.executor.cancel(self)
+
+    def __repr__(self):
+        return f"ActionTask({self.name!r}, {self.state})"
+
+
+class ActionExecutor:
+    """
+    Exécution des actions hors du thread Kivy :
+
+    - fonctions bloquantes sur un pool de threads (`max_workers`) ;
+    - coroutines (async def) sur une boucle asyncio dédiée, dans son thread ;
+    - au plus `max_concurrent` actions en cours, les suivantes attendent en
+      file (ordre d'arrivée) ;
+    - on_done(result) / on_error(exc) sont rappelés sur le thread Kivy ;
+    - cancel() retire une action en file, annule une coroutine en cours
+      (CancelledError) ; une fonction déjà lancée dans un thread va à son
+      terme mais ses rappels sont supprimés.
+    """
+
+    def __init__(self, max_workers=4, max_concurrent=None):
+        self.max_workers = max_workers
+        self.max_concurrent = max_concurrent or max_workers
+        self._lock = threading.Lock()
+        self._waiting = deque()
+        self._running = set()
+        self._pool = None
+        self._loop = None
+
+    def submit(self, name, func, args=(), kwargs=None, on_done=None, on_error=None):
+        task = ActionTask(self, name, func, args, kwargs or {}, on_done, on_error)
+        with self._lock:
+            start = len(self._running) < self.max_concurrent
+            if start:
+                self._running.add(task)
+            else:
+                self._waiting.append(task)
+        if start:
+            self._start(task)
+        return task
+
+    def cancel(self, task):
+        with self._lock:
+            if task in self._waiting:
+                self._waiting.remove(task)
+                task.state = "cancelled"
+                return True
+        if task.done:
+            return False
+        task.state = "cancelled"
+        if task._future is not None:
+            task._future.cancel()
+        return True
+
+    def cancel_all(self):
+        with self._lock:
+            tasks = list(self._waiting) + list(self._running)
+        for task in tasks:
+            self.cancel(task)
+
+    def pending(self):
+        """Actions en cours ou en file."""
+        with self._lock:
+            return list(self._running) + list(self._waiting)
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    def _thread_pool(self):
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mefu-action")
+        return self._pool
+
+    def _event_loop(self):
+        if self._loop is None:
+            import asyncio
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="mefu-asyncio", daemon=True).start()
+            self._loop = loop
+        return self._loop
+
+    def _start(self, task):
+        if task.state == "cancelled":
+            self._finished(task, None)
+            return
+        task.state = "running"
+        try:
+            if inspect.iscoroutinefunction(task.func):
+                import asyncio
+                future = asyncio.run_coroutine_threadsafe(task.func(*task.args, **task.kwargs), self._event_loop())
+            else:
+                future = self._thread_pool().submit(task.func, *task.args, **task.kwargs)
+        except Exception as exc:
+            # Pool arrêté, handler non appelable… : même chemin qu'un échec
+            with self._lock:
+                self._running.discard(task)
+            Clock.schedule_once(lambda dt: self._deliver(task, None, exc))
+            return
+        task._future = future
+        future.add_done_callback(lambda f: self._finished(task, f))
+
+    def _finished(self, task, future):
+        # Thread du pool / de la boucle : libère le créneau puis rappelle sur le thread Kivy
+        with self._lock:
+            self._running.discard(task)
+            following = None
+            if self._waiting and len(self._running) < self.max_concurrent:
+                following = self._waiting.popleft()
+                self._running.add(following)
+        if following is not None:
+            self._start(following)
+        if future is None or future.cancelled():
+            return
+        error = future.exception()
+        result = None if error is not None else future.result()
+        Clock.schedule_once(lambda dt: self._deliver(task, result, error))
+
+    def _deliver(self, task, result, error):
+        if task.state == "cancelled":
+            return
+        if error is not None:
+            task.state, task.error = "failed", error
+            if task.on_error is not None:
+                task.on_error(error)
+            else:
+                print(f"Action {task.name} en échec : {error!r}")
+        else:
+            task.state, task.result = "done", result
+            if task.on_done is not None:
+                task.on_done(result)
+
+
+class OutsideTouchDispatcher:
+    """
+    Fermeture au clic extérieur pour tous les menus ouverts du processus.
+
+    Un seul callback Window.on_touch_down, lié à l'ouverture du premier menu
+    et délié à la fermeture du dernier : ouvrir / fermer des menus (et
+    sous-menus) ne fait jamais croître la liste des observateurs de Window.
+    """
+
+    _menus = []
+    _bound = False
+
+    @classmethod
+    def register(cls, mefu):
+        if mefu not in cls._menus:
+            cls._menus.append(mefu)
+        if not cls._bound:
+            Window.bind(on_touch_down=cls._on_touch_down)
+            cls._bound = True
+
+    @classmethod
+    def unregister(cls, mefu):
+        if mefu in cls._menus:
+            cls._menus.remove(mefu)
+        if cls._bound and not cls._menus:
+            Window.unbind(on_touch_down=cls._on_touch_down)
+            cls._bound = False
+
+    @classmethod
+    def _on_touch_down(cls, window, touch):
+        for mefu in list(cls._menus):
+            mefu._global_touch(touch)
+        return False
+
+
+class MenuNode:
+    """
+    Nœud compilé du menu (une entrée de menu_config, ou la racine).
+
+    `children` est un tuple de nœuds, `parent` pointe vers le niveau
+    au-dessus, `path` / `path_id` identifient le nœud dans l'arbre
+    (ex. "1/3"). `action` est le handler déjà résolu (ou None tant que
+    l'action n'a pas été enregistrée via add_action).
+    """
+    __slots__ = ("name", "icon", "handler_name", "action", "children",
+                 "parent", "index", "path", "path_id")
+
+    def __init__(self, name, icon, handler_name, parent, index):
+        self.name = name
+        self.icon = icon
+        self.handler_name = sys.intern(handler_name) if handler_name else None
+        self.action = None
+        self.children = ()
+        self.parent = parent
+        self.index = index
+        self.path = parent.path + (index,) if parent is not None else ()
+        self.path_id = "/".join(map(str, self.path))
+
+    @property
+    def has_children(self):
+        return bool(self.children)
+
+    def __repr__(self):
+        return f"MenuNode({self.path_id or '<racine>'!r}, {self.name!r})"
+
+
+def compile_menu(menu_config):
+    """
+    Compile menu_config ({"menu": {"items": [...]}}) en arbre de MenuNode.
+    Renvoie (racine, index path_id -> nœud).
+    """
+    root = MenuNode("", None, None, None, 0)
+    nodes = {root.path_id: root}
+
+    def build(parent, items):
+        children = []
+        for index, item in enumerate(items):
+            node = MenuNode(item.get("name", ""), item.get("icon"), item.get("handler"), parent, index)
+            nodes[node.path_id] = node
+            if item.get("children"):
+                build(node, item["children"])
+            children.append(node)
+        parent.children = tuple(children)
+
+    build(root, menu_config["menu"]["items"])
+    return root, nodes
+
+
+def match_menu_nodes(old_root, new_root):
+    """
+    Correspondance ancien nœud -> nouveau nœud entre deux compilations, par
+    chemin de noms (indépendant des positions) : à nom égal, le même
+    handler départage, puis l'ordre. Un nœud renommé ou supprimé n'a pas de
+    correspondant.
+    """
+    matches = {old_root: new_root}
+    stack = [(old_root, new_root)]
+    while stack:
+        old, new = stack.pop()
+        if not old.children or not new.children:
+            continue
+        by_name = {}
+        for child in new.children:
+            by_name.setdefault(child.name, []).append(child)
+        pending = []
+        for child in old.children:
+            candidates = by_name.get(child.name)
+            if not candidates:
+                continue
+            same = next((c for c in candidates if c.handler_name == child.handler_name), None)
+            if same is None:
+                pending.append(child)
+                continue
+            candidates.remove(same)
+            matches[child] = same
+            stack.append((child, same))
+        for child in pending:
+            candidates = by_name.get(child.name)
+            if candidates:
+                other = candidates.pop(0)
+                matches[child] = other
+                stack.append((child, other))
+    return matches
+
+
+def _longest_increasing(values):
+    """Indices d'une plus longue sous-suite strictement croissante de `values`."""
+    tails, tail_index, previous = [], [], [None] * len(values)
+    for index, value in enumerate(values):
+        at = bisect_left(tails, value)
+        if at == len(tails):
+            tails.append(value)
+            tail_index.append(index)
+        else:
+            tails[at] = value
+            tail_index[at] = index
+        previous[index] = tail_index[at - 1] if at else None
+    kept = set()
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        kept.add(index)
+        index = previous[index]
+    return kept
+
+
+def fold_text(text):
+    """Minuscules, sans accents ni ponctuation, mots séparés par une espace."""
+    text = text.lower()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(re.findall(r"\w+", text))
+
+
+def _trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MenuSearchIndex:
+    """
+    Index de recherche sur tout l'arbre compilé, construit une fois par
+    menu_config :
+
+    - préfixes : liste triée des mots des noms -> nœud, interrogée par
+      bisect (O(log n) + résultats) ; une requête à plusieurs mots
+      ("coul rou") retient les nœuds dont nom + chemin contiennent chaque
+      préfixe, l'un d'eux au moins dans le nom ;
+    - trigrammes des noms, pour les fautes de frappe : seuls les nœuds
+      présents dans les listes d'occurrences les plus rares sont évalués (un
+      nœud qui partage au moins `min_similarity` des trigrammes de la
+      requête figure forcément dans l'une d'elles).
+
+    Les correspondances par préfixe passent avant les approximatives, qui ne
+    servent qu'à compléter la liste.
+    """
+
+    CANDIDATE_CAP = 512
+
+    def __init__(self, root, min_similarity=0.5):
+        self.min_similarity = min_similarity
+        self.nodes = []
+        self._names = []
+        self._texts = []
+        self._grams = []
+        postings = defaultdict(list)
+        words = []
+        stack = [(child, "") for child in reversed(root.children)]
+        while stack:
+            node, path = stack.pop()
+            ident = len(self.nodes)
+            name = fold_text(node.name)
+            text = f"{path} {name}"
+            self.nodes.append(node)
+            self._names.append(" " + name)
+            self._texts.append(text)
+            grams = _trigrams(name)
+            self._grams.append(grams)
+            for gram in grams:
+                postings[gram].append(ident)
+            words.extend((word, ident) for word in set(name.split()))
+            if node.children:
+                stack.extend((child, text) for child in reversed(node.children))
+        words.sort()
+        self._words = [word for word, _ in words]
+        self._word_ids = [ident for _, ident in words]
+        self._postings = dict(postings)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def search(self, query, limit=20):
+        """Nœuds (feuilles et sous-menus) correspondant à `query`, du plus pertinent au moins pertinent."""
+        query = fold_text(query)
+        if not query:
+            return []
+        scores = self._prefix_scores(query.split(), limit)
+        if len(scores) < limit and len(query) >= 3:
+            for ident, score in self._fuzzy_scores(query).items():
+                scores.setdefault(ident, score)
+        ranked = sorted(scores, key=lambda i: (-scores[i], len(self.nodes[i].path), len(self._names[i]), i))
+        return [self.nodes[i] for i in ranked[:limit]]
+
+    def _prefix_scores(self, terms, limit):
+        prefixes = [" " + term for term in terms]
+        whole = " " + " ".join(terms)
+        scan = max(64, 8 * limit)
+        scores = {}
+        for term in terms:
+            lo = bisect_left(self._words, term)
+            hi = min(bisect_left(self._words, term + "\uffff"), lo + scan)
+            for k in range(lo, hi):
+                ident = self._word_ids[k]
+                if ident in scores or not all(prefix in self._texts[ident] for prefix in prefixes):
+                    continue
+                name = self._names[ident]
+                if name.startswith(whole):
+                    scores[ident] = 3.0
+                elif all(prefix in name for prefix in prefixes):
+                    scores[ident] = 2.5
+                else:
+                    scores[ident] = 2.0
+        return scores
+
+    def _fuzzy_scores(self, query):
+        grams = _trigrams(query)
+        needed = max(1, int(len(grams) * self.min_similarity + 0.999))
+        lists = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set()
+        for posting in lists[:len(grams) - needed + 1]:
+            for ident in posting:
+                candidates.add(ident)
+                if len(candidates) >= self.CANDIDATE_CAP:
+                    break
+            else:
+                continue
+            break
+        scores = {}
+        for ident in candidates:
+            shared = len(grams & self._grams[ident])
+            if shared >= needed:
+                scores[ident] = shared / len(grams)
+        return scores
+
+
+class MenuFileWatcher:
+    """
+    Surveille un fichier de menu JSON ou YAML (.yaml / .yml) : un thread
+    compare périodiquement mtime / taille, relit et parse le fichier hors du
+    thread Kivy, puis livre le nouveau menu_config à `on_config` via Clock
+    s'il diffère du précédent. Un fichier invalide est signalé et ignoré
+    (le menu courant reste en place).
+    """
+
+    def __init__(self, path, on_config, interval=1.0):
+        self.path = Path(path)
+        self.on_config = on_config
+        self.interval = interval
+        self._stamp = None
+        self._config = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name="mefu-menu-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def load(self):
+        """Lit et parse le fichier (n'importe quel thread) ; None s'il est vide."""
+        text = self.path.read_text(encoding="utf-8")
+        if not text.strip():
+            return None
+        if self.path.suffix.lower() in (".yaml", ".yml"):
+            config = _yaml().safe_load(text)
+        else:
+            config = json.loads(text)
+        if not isinstance(config, dict) or not isinstance(config.get("menu", {}).get("items"), list):
+            raise ValueError("structure attendue : {\"menu\": {\"items\": [...]}}")
+        return config
+
+    def _watch_loop(self):
+        while not self._stopped.is_set():
+            try:
+                stat = self.path.stat()
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                if stamp != self._stamp:
+                    self._stamp = stamp
+                    config = self.load()
+                    if config is None:
+                        # Fichier en cours d'écriture : relu au prochain passage
+                        self._stamp = None
+                    elif config != self._config:
+                        self._config = config
+                        Clock.schedule_once(lambda dt, c=config: self._deliver(c))
+            except FileNotFoundError:
+                pass
+            except Exception as exc:
+                print(f"MenuFileWatcher : {self.path} ignoré : {exc}")
+            self._stopped.wait(self.interval)
+
+    def _deliver(self, config):
+        if not self._stopped.is_set():
+            self.on_config(config)
+
 
 class MeFu(FloatLayout):
-    def __init__(self, theme_cls, menu_config, size, _b_activate_gestual=False, _b_anim=False,  **kwargs):
+    def __init__(self, theme_cls, menu_config, size, _b_activate_gestual=False, _b_anim=False,
+                 max_menu_height=None, gesture_options=None, latency=False, latency_overlay=False,
+                 async_actions=False, _b_activate_vocal=False, voice_options=None,
+                 prefetch=True, level_cache_rows=600, search=False, search_limit=20, trace=None,
+                 **kwargs):
         super().__init__(**kwargs)
         self.theme_cls = theme_cls
         self.menu_config = menu_config
         self.size_param = size
+        # Au-delà de cette hauteur le niveau passe en mode virtualisé (RecycleView
+        # défilante, seules les lignes visibles sont construites).
+        # None = hauteur de la fenêtre moins les marges.
+        self.max_menu_height = max_menu_height
         self.menu_history = []
         self.menu_card = None
+        self._menu_card_widget = None
+        # Animation des lignes : seuils précalculés, lignes visibles, état de fermeture
+        self._reveal_rows = []
+        self._reveal_thresholds = []
+        self._reveal_count = None
+        self._reveal_key = None
+        self._reveal_height = 0
+        self._closing = False
+        self._close_from = None
         self.menu_layout = None
         self.mtx = False
         self._b_anim = _b_anim
         self.sub = self.SubMeFu(self)
         self.action_methods = {}
+        # Actions en arrière-plan (opt-in) : True ou options de l'ActionExecutor
+        # (ex. {"max_workers": 4, "max_concurrent": 2}) ; les coroutines y
+        # passent toujours
+        self.async_actions = async_actions
+        self._actions = None
+        # Modèle compilé : niveau courant + index des nœuds par chemin / handler
+        self.menu_root = None
+        self.current_node = None
+        self._nodes = {}
+        self._nodes_by_handler = {}
+        self._compiled_config = None
         self.selection_triggered = False
+        # Index géométrique des lignes affichées (navigation gestuelle)
+        self._row_index = None
+        self._row_bottoms = []
+        self._indexed_rows = []
+        self._hovered_row = None
         # Tracking pour normalisation de position (ex-MeFuApp)
         self._from_gesture = False
         self._click_pos = (0, 0)
-        
+        # Cache des niveaux déjà construits (clé : nœud + mode virtualisé)
+        # et réserve de cartes d'items recyclables
+        self._level_cache = {}
+        self._card_pool = []
+        # Préconstruction des sous-menus survolés et plafond du cache
+        # (nombre total de lignes construites conservées)
+        self.prefetch = prefetch
+        self.level_cache_rows = level_cache_rows
+        self._prefetch = None
+        self._prefetch_trigger = Clock.create_trigger(self._prefetch_step, 0)
+        # Recherche dans tout l'arbre (champ en tête de carte) ; l'index est
+        # reconstruit en arrière-plan à chaque compilation
+        self.search_enabled = search
+        self.search_limit = search_limit
+        self._search_index = None
+        self._search_field = None
+        self._search_layout = None
+        self._search_saved = None
+        self._search_resetting = False
+        self._compile_menu()
+        if hasattr(theme_cls, "bind"):
+            theme_cls.bind(
+                theme_style=self._on_theme_change,
+                primary_palette=self._on_theme_change,
+                accent_palette=self._on_theme_change,
+            )
+
+        # Instrumentation de latence (opt-in, partagée par le processus) et
+        # overlay optionnel des percentiles
+        self._open_started = None
+        self._latency_overlay = None
+        self._latency_event = None
+        if latency or latency_overlay:
+            enable_latency_monitor()
+        if latency_overlay:
+            self.show_latency_overlay()
+        # Journal d'interactions (opt-in) : chemin du fichier de trace
+        if trace:
+            enable_event_tracer(trace)
+
+        # Options transmises au GesturePipeline (ex. {"rate_policy": {"idle_fps": 2}})
+        self.gesture_options = gesture_options or {}
         if _b_activate_gestual:
-            self.camera_widget = self.CameraWidget(self.gesture_callback, size_hint=(1, 1))
+            self.camera_widget = self.CameraWidget(self.gesture_callback, gesture_options=self.gesture_options,
+                                                   size_hint=(1, 1))
             self.camera_widget.opacity = 0
             self.add_widget(self.camera_widget)
 
+        # Commandes vocales : options du VoiceCommandEngine (ex. {"model_path": ...})
+        self.voice_options = voice_options or {}
+        self.voice = None
+        self._voice_targets_cache = (None, {})
+        # Fichier de menu surveillé (watch_menu_file)
+        self.menu_watcher = None
+        if _b_activate_vocal:
+            self.enable_voice()
+
         Window.bind(on_mouse_down=self._on_mouse)
+        Window.bind(mouse_pos=self._on_mouse_pos)
 
     def _on_mouse(self, window, x, y, button, modifiers):
-        if button == "right":
-            self.show_menu((x, y))
+        tracer = _tracer
+        if tracer is None:
+            if button == "right":
+                self.show_menu((x, y))
+            return
+        start = tracer.begin()
+        try:
+            if button == "right":
+                self.show_menu((x, y))
+        finally:
+            tracer.record(_trace().MOUSE, start, tracer.name_id(button), 0, x, y)
+
+    def add_action(self, option_name, method, background=None, on_done=None, on_error=None):
+        """
+        Associe `method` au handler `option_name`. En arrière-plan (background,
+        par défaut si async_actions ou si `method` est une coroutine) le menu
+        se ferme aussitôt et l'appel renvoie un ActionTask ; on_done(result) /
+        on_error(exc) sont rappelés sur le thread Kivy. Un handler en
+        arrière-plan ne doit pas toucher aux widgets : c'est le rôle de on_done.
+        """
+        if background is None:
+            background = bool(self.async_actions) or inspect.iscoroutinefunction(method)
 
-    def add_action(self, option_name, method):
         def wrapper(*args, **kwargs):
+            if background:
+                self.sub.close_menu(self)
+                return self.action_executor().submit(option_name, method, args, kwargs, on_done, on_error)
             result = method(*args, **kwargs)
             self.sub.close_menu(self)
             return result
         self.action_methods[option_name] = wrapper
+        # Résolution unique : les nœuds qui référencent ce handler pointent sur le wrapper
+        for node in self._nodes_by_handler.get(option_name, ()):
+            node.action = wrapper
+
+    def action_executor(self):
+        if self._actions is None:
+            options = self.async_actions if isinstance(self.async_actions, dict) else {}
+            self._actions = ActionExecutor(**options)
+        return self._actions
+
+    def running_actions(self):
+        """Actions en arrière-plan en cours ou en file."""
+        return self._actions.pending() if self._actions is not None else []
+
+    def cancel_actions(self):
+        if self._actions is not None:
+            self._actions.cancel_all()
+
+    # --- Recherche -------------------------------------------------------
+    SEARCH_HEIGHT = 56
+
+    def search(self, query, limit=20):
+        """Nœuds de tout l'arbre correspondant à `query` (voir MenuSearchIndex)."""
+        self._ensure_compiled()
+        if self._search_index is None or self._search_index[0] is not self.menu_root:
+            self._search_index = (self.menu_root, MenuSearchIndex(self.menu_root))
+        return self._search_index[1].search(query, limit)
+
+    def _build_search_index_async(self):
+        root = self.menu_root
+
+        def build():
+            index = MenuSearchIndex(root)
+            Clock.schedule_once(lambda dt: self._on_search_index(root, index))
+
+        threading.Thread(target=build, name="mefu-search-index", daemon=True).start()
+
+    def _on_search_index(self, root, index):
+        if root is not self.menu_root:
+            return
+        self._search_index = (root, index)
+        if self._search_field is not None and self._search_field.text.strip():
+            self._on_search_text(self._search_field, self._search_field.text)
+
+    def _on_search_text(self, field, text):
+        if self._search_resetting or not self.mtx or self.menu_card is None or self._closing:
+            return
+        if not text.strip():
+            self._end_search()
+            return
+        if self._search_index is None or self._search_index[0] is not self.menu_root:
+            # Index en construction : la recherche est relancée à sa livraison
+            return
+        max_rows = max(1, int((self._menu_height_limit() - 30) // 60))
+        self._show_search_results(self._search_index[1].search(text, min(self.search_limit, max_rows)))
+
+    def _show_search_results(self, nodes):
+        """Remplace le niveau affiché par les résultats (cartes réutilisées en place)."""
+        layout = self._search_layout
+        if layout is None:
+            layout = self._search_layout = BoxLayout(orientation="vertical", padding=[15, 15, 15, 15], spacing=10)
+        if self._search_saved is None:
+            host = self.menu_card.mefu_host
+            self._search_saved = self.menu_layout
+            host.remove_widget(self.menu_layout)
+            host.add_widget(layout)
+            self.menu_layout = layout
+        rows = list(reversed(layout.children))
+        for index, node in enumerate(nodes):
+            if index < len(rows):
+                card = rows[index]
+                self._configure_item_card(card, node)
+            else:
+                card = self._make_item_card(node)
+                layout.add_widget(card)
+            card.mefu_label.text = self._node_path_label(node)
+            card.opacity = 1
+        for card in rows[len(nodes):]:
+            layout.remove_widget(card)
+            self._card_pool.append(card)
+        self._set_hovered(None)
+        self._resize_open_card(len(nodes))
+        self._invalidate_row_index()
+
+    @staticmethod
+    def _node_path_label(node):
+        names = []
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return " › ".join(reversed(names))
+
+    def _end_search(self):
+        """Champ vidé : retour au niveau affiché avant la recherche."""
+        saved, self._search_saved = self._search_saved, None
+        if saved is None:
+            return
+        host = self.menu_card.mefu_host
+        host.remove_widget(self.menu_layout)
+        host.add_widget(saved)
+        self.menu_layout = saved
+        for row in self._level_cards(saved):
+            row.opacity = 1
+        self._set_hovered(None)
+        self._resize_open_card(len(self.current_node.children) + bool(self.menu_history))
+        self._invalidate_row_index()
+
+    # --- Modèle compilé --------------------------------------------------
+    def _compile_menu(self):
+        """
+        (Re)compile menu_config. Les niveaux déjà en cache, l'historique et la
+        position sont rattachés aux nouveaux nœuds de même chemin de noms (voir
+        match_menu_nodes) ; les niveaux sont patchés ligne par ligne.
+        """
+        self._cancel_prefetch()
+        old_cache = self._level_cache
+        old_root = self.menu_root
+        self.menu_root, self._nodes = compile_menu(self.menu_config)
+        matches = match_menu_nodes(old_root, self.menu_root) if old_root is not None else {}
+        self._compiled_config = self.menu_config
+        self._nodes_by_handler = {}
+        for node in self._nodes.values():
+            if node.handler_name:
+                self._nodes_by_handler.setdefault(node.handler_name, []).append(node)
+                node.action = self.action_methods.get(node.handler_name)
+        self._level_cache = {}
+        for (old_node, virtual), entry in old_cache.items():
+            node = matches.get(old_node)
+            if node is None or not node.children:
+                self._release_level(entry["layout"])
+                continue
+            entry["node"] = node
+            self._level_cache[(node, virtual)] = entry
+            self._sync_level(entry, matches)
+            entry["rows"] = self._level_rows(node, entry["layout"])
+        # Historique / position : on conserve le chemin s'il existe toujours
+        history = [matches.get(n) for n in self.menu_history]
+        current = matches.get(self.current_node) if self.current_node else None
+        if current is None or None in history or (current.parent is not None and not current.children):
+            history, current = [], self.menu_root
+        self.menu_history = history
+        self.current_node = current
+        self._search_index = None
+        if self.search_enabled:
+            self._build_search_index_async()
+
+    def _ensure_compiled(self):
+        # Comparaison d'identité : une modification en place passe par set_menu_config()
+        if self._compiled_config is not self.menu_config:
+            self._compile_menu()
+
+    def find_node(self, path_id):
+        """Nœud par chemin (ex. "1/3"), en O(1)."""
+        self._ensure_compiled()
+        return self._nodes.get(path_id)
 
     def show_menu(self, pos):
         """
         Ouvre le menu au clic droit avec normalisation optionnelle (HiDPI + inversion Y).
         """
+        tracer = _tracer
+        if tracer is None:
+            return self._show_menu(pos)
+        start = tracer.begin()
+        try:
+            return self._show_menu(pos)
+        finally:
+            tracer.record(_trace().SHOW_MENU, start, 0, 0, pos[0], pos[1])
+
+    def _show_menu(self, pos):
         raw_x, raw_y = pos
 
         # Heuristique HiDPI (ex-Retina)
@@ -107,6 +1760,17 @@ class MeFu(FloatLayout):
         self.sub.show_context_menu(self._click_pos, self)
 
     def gesture_callback(self, gesture, pos, select=False):
+        tracer = _tracer
+        if tracer is None:
+            return self._handle_gesture(gesture, pos, select)
+        start = tracer.begin()
+        try:
+            return self._handle_gesture(gesture, pos, select)
+        finally:
+            tracer.record(_trace().GESTURE, start, tracer.name_id(gesture),
+                          _trace().SELECT if select else 0, pos[0], pos[1])
+
+    def _handle_gesture(self, gesture, pos, select=False):
         if gesture == "open_menu":
             # Forcer le menu au centre pour un geste d'ouverture
             self._from_gesture = True
@@ -120,40 +1784,162 @@ class MeFu(FloatLayout):
         elif gesture == "navigate":
             if self.mtx and self.menu_card is not None:
                 if self.menu_card.collide_point(*pos):
-                    hovered = None
-                    for child in self.menu_layout.children:
-                        child_x, child_y = child.to_window(child.x, child.y)
-                        if (pos[0] >= child_x and pos[0] <= child_x + child.width and
-                            pos[1] >= child_y and pos[1] <= child_y + child.height):
-                            hovered = child
-                            child.md_bg_color = self.theme_cls.accent_light
-                        else:
-                            child.md_bg_color = self.theme_cls.bg_normal
+                    hovered = self._row_at(pos)
+                    self._set_hovered(hovered)
                     if hovered:
                         if select:
                             if not self.selection_triggered:
-                                if any(hasattr(w, "text") and w.text == "Retour" for w in hovered.children):
+                                if getattr(hovered, "mefu_is_back", False):
                                     self._go_back()
                                 else:
-                                    fake_touch = self.FakeTouch(pos)
+                                    # Coordonnées du parent de la ligne (≠ fenêtre dans une RecycleView)
+                                    fake_touch = self.FakeTouch(hovered.parent.to_widget(*pos))
                                     hovered.dispatch("on_touch_down", fake_touch)
                                     hovered.dispatch("on_touch_up", fake_touch)
                                 self.selection_triggered = True
                         else:
                             self.selection_triggered = False
+                    rv = getattr(self.menu_layout, "mefu_rv", None)
+                    if rv is not None:
+                        self._edge_scroll(rv, pos)
                 else:
-                    for child in self.menu_layout.children:
-                        child.md_bg_color = self.theme_cls.bg_normal
+                    self._set_hovered(None)
                     self.selection_triggered = False
 
+    # --- Index géométrique des lignes ------------------------------------
+    def _invalidate_row_index(self, *args):
+        if self._row_index is None:
+            return
+        for row in self._indexed_rows:
+            row.funbind("pos", self._invalidate_row_index)
+        self._indexed_rows = []
+        self._row_index = None
+
+    def _build_row_index(self):
+        """
+        Rectangles (fenêtre) des lignes visibles, triés par y. Reconstruit
+        seulement après un changement de mise en page (animation, défilement,
+        changement de niveau) ; chaque ligne indexée invalide l'index si elle bouge.
+        """
+        entries = []
+        rv = getattr(self.menu_layout, "mefu_rv", None)
+        if rv is not None:
+            _, clip_y0 = rv.to_window(rv.x, rv.y)
+            clip_y1 = clip_y0 + rv.height
+        for row in self._visible_rows():
+            x, y = row.to_window(row.x, row.y)
+            top = y + row.height
+            if rv is not None and row.parent is rv.layout_manager:
+                # Vues recyclées partiellement hors du viewport : on rogne
+                y, top = max(y, clip_y0), min(top, clip_y1)
+                if top <= y:
+                    continue
+            entries.append((y, top, x, x + row.width, row))
+            row.fbind("pos", self._invalidate_row_index)
+            self._indexed_rows.append(row)
+        entries.sort(key=lambda e: e[0])
+        self._row_index = entries
+        self._row_bottoms = [e[0] for e in entries]
+
+    def _row_at(self, pos):
+        """Ligne sous `pos` (coordonnées fenêtre) en O(log n), ou None."""
+        if self._row_index is None:
+            self._build_row_index()
+        i = bisect_right(self._row_bottoms, pos[1]) - 1
+        if i < 0:
+            return None
+        y0, y1, x0, x1, row = self._row_index[i]
+        if pos[1] <= y1 and x0 <= pos[0] <= x1:
+            return row
+        return None
+
+    def _set_hovered(self, row):
+        """Surbrillance uniquement sur transition de survol."""
+        previous = self._hovered_row
+        if row is previous:
+            return
+        if previous is not None:
+            self._style_row(previous)
+        if row is not None:
+            row.md_bg_color = self.theme_cls.accent_light
+            node = getattr(row, "mefu_node", None)
+            if node is not None and node.children:
+                self._prefetch_level(node)
+            monitor = _latency
+            if monitor is not None:
+                monitor.record_since_frame("highlight")
+        self._hovered_row = row
+
+    def _on_rows_scrolled(self, *args):
+        # Les vues recyclées changent de données : l'ancienne surbrillance n'a plus de sens
+        self._set_hovered(None)
+        self._invalidate_row_index()
+
+    def _edge_scroll(self, rv, pos):
+        """Mode virtualisé : défilement quand le curseur gestuel touche le haut / bas de la liste."""
+        if not rv.children:
+            return
+        overflow = rv.children[0].height - rv.height
+        if overflow <= 0:
+            return
+        rx, ry = rv.to_window(rv.x, rv.y)
+        if not (rx <= pos[0] <= rx + rv.width):
+            return
+        band = min(dp(40), rv.height * 0.15)
+        step = dp(12) / overflow
+        if ry <= pos[1] < ry + band:
+            rv.scroll_y = max(0.0, rv.scroll_y - step)
+        elif ry + rv.height - band < pos[1] <= ry + rv.height:
+            rv.scroll_y = min(1.0, rv.scroll_y + step)
+
+    def _visible_rows(self):
+        """
+        Lignes réellement affichées, de bas en haut (même ordre que
+        menu_layout.children). En mode virtualisé : les vues recyclées
+        visibles de la RecycleView, puis 'Retour' s'il existe.
+        """
+        if self.menu_layout is None:
+            return []
+        rv = getattr(self.menu_layout, "mefu_rv", None)
+        if rv is None:
+            return self.menu_layout.children
+        rows = sorted(rv.layout_manager.children, key=lambda w: w.y) if rv.layout_manager else []
+        return rows + [c for c in self.menu_layout.children if c is not rv]
+
+    def _menu_height_limit(self):
+        """Hauteur disponible pour les lignes (champ de recherche déduit)."""
+        if self.max_menu_height is not None:
+            return self.max_menu_height - self._search_height()
+        return Window.height - dp(20) - self._search_height()
+
+    def _search_height(self):
+        return self.SEARCH_HEIGHT if self.search_enabled else 0
+
+    def _card_height(self, rows):
+        return min(rows * 60 + 30, self._menu_height_limit()) + self._search_height()
+
+    def _resize_open_card(self, rows):
+        """Ajuste la carte ouverte à `rows` lignes, bord haut fixe, sans animation."""
+        from kivy.animation import Animation
+        card = self.menu_card
+        Animation.cancel_all(card)
+        height = self._card_height(rows)
+        card.pos = (card.x, max(dp(10), card.y + card.height - height))
+        card.height = height
+
     def _create_context_menu(self, pos, parent_layout):
         self._close_menu(parent_layout)
         self.main_layout = parent_layout
-        num_items = len(self.menu_config["menu"]["items"])
+        self._ensure_compiled()
+        num_items = len(self.current_node.children)
         if self.menu_history:
             num_items += 1
         menu_width = self.size_param
         menu_height = num_items * 60 + 30
+        virtual = menu_height > self._menu_height_limit()
+        if virtual:
+            menu_height = self._menu_height_limit()
+        menu_height += self._search_height()
         if pos :
             self.pos = pos
         x, y = self.pos  # x,y = position du clic (coin supérieur gauche souhaité)
@@ -166,13 +1952,9 @@ class MeFu(FloatLayout):
 
         # --- SUPPRESSION de l'ancien ajustement vertical ici ---
 
-        self.menu_card = MDCard(
-            size_hint=(None, None),
-            size=(menu_width, 0),
-            pos=(x, y),
-            elevation=12,
-            radius=[15],
-        )
+        self.menu_card = self._acquire_menu_card()
+        self.menu_card.size = (menu_width, 0)
+        self.menu_card.pos = (x, y)
 
         # Ajustement post-création si ouverture par clic (utilise _click_pos déjà normalisé)
         if not self._from_gesture:
@@ -182,53 +1964,462 @@ class MeFu(FloatLayout):
             final_y = min(max(dp(10), y), Window.height - menu_height - dp(10))
             self.menu_card.pos = (final_x, final_y)
 
-        self.menu_layout = MDBoxLayout(
-            orientation="vertical",
-            padding=[15, 24, 15, 15],  # valeur par défaut (sans sous-menu)
-            spacing=10
-        )
+        self.menu_layout = self._get_level(self.current_node, virtual)
+        # Si on est dans un sous-menu, garantir l'opacité de 'Retour'
+        if self.menu_history and self.menu_layout.children:
+            self.menu_layout.children[-1].opacity = 1
+        self.menu_card.mefu_host.add_widget(self.menu_layout)
+        parent_layout.add_widget(self.menu_card)
+        if self._search_field is not None and not self._from_gesture:
+            self._search_field.focus = True
+        OutsideTouchDispatcher.register(self)
+        from kivy.animation import Animation
+        self._reveal_key = None
+        self._reveal_height = menu_height
+        anim_open = Animation(size=(menu_width, menu_height), d=0.3, t="out_cubic")
+        anim_open.bind(on_progress=self._show_items_progressivement)
+        anim_open.start(self.menu_card)
+        monitor = _latency
+        if monitor is not None and self._open_started is not None:
+            monitor.record("menu_open", time.perf_counter() - self._open_started)
+        self._open_started = None
 
-        if self.menu_history:
-            back_item = MDCard(
-                orientation="horizontal",
-                spacing=15,
-                size_hint_y=None,
-                height=50,
-                radius=[10],
-                md_bg_color=self.theme_cls.bg_normal,
-                ripple_behavior=True,
-                ripple_color=(0, 0, 0, 0.2)
-            )
-            back_icon = MDIconButton(
-                icon="arrow-left",
-                theme_text_color="Custom",
-                text_color=self.theme_cls.accent_color,
+    def _acquire_menu_card(self):
+        """
+        Carte du menu, construite une seule fois par instance : chaque MDCard
+        neuve laisse des observateurs dans theme_cls, qui s'accumuleraient
+        d'une ouverture à l'autre.
+
+        Les niveaux sont posés dans un BoxLayout Kivy intermédiaire
+        (mefu_host) : le remove_widget des widgets KivyMD parcourt tous les
+        observateurs de theme_cls pour chaque descendant retiré, ce qui
+        rendait coûteux le premier échange de chaque niveau mis en cache.
+        """
+        from kivy.animation import Animation
+        card = self._menu_card_widget
+        if card is None:
+            card = MDCard(size_hint=(None, None), elevation=12, radius=[15])
+            card.fbind("size", self._invalidate_row_index)
+            card.fbind("pos", self._invalidate_row_index)
+            card.mefu_host = BoxLayout(orientation="vertical")
+            card.add_widget(card.mefu_host)
+            if self.search_enabled:
+                self._search_field = MDTextField(hint_text="Rechercher", size_hint=(1, None))
+                self._search_field.bind(text=self._on_search_text)
+                field_box = BoxLayout(size_hint_y=None, height=self.SEARCH_HEIGHT, padding=[15, 4, 15, 0])
+                field_box.add_widget(self._search_field)
+                card.mefu_host.add_widget(field_box)
+            self._menu_card_widget = card
+        else:
+            # Animation d'un niveau précédent (saut de sous-menu) encore en cours
+            Animation.cancel_all(card)
+        return card
+
+    # --- Instrumentation de latence --------------------------------------
+    def latency_stats(self):
+        """Percentiles par étape (voir LatencyMonitor.stats), {} si désactivée."""
+        monitor = _latency
+        return monitor.stats() if monitor is not None else {}
+
+    def show_latency_overlay(self, interval=0.5):
+        """Affiche p50/p95/p99 par étape en haut à gauche de la fenêtre."""
+        enable_latency_monitor()
+        if self._latency_overlay is None:
+            self._latency_overlay = Label(
                 size_hint=(None, None),
-                size=(dp(40), dp(40)),
-                pos_hint={"center_y": 0.5},
-                on_release=lambda x: self._go_back()
-            )
-            back_label = MDLabel(
-                text="Retour",
-                theme_text_color="Custom",
-                text_color=self.theme_cls.text_color,
+                font_size=dp(11),
+                font_name="RobotoMono-Regular",
                 halign="left",
-                size_hint=(1, None),
-                height=dp(40),
-                pos_hint={"center_y": 0.5},
+                valign="top",
+                color=(1, 1, 1, 0.85),
             )
-            back_item.md_bg_color = self.theme_cls.bg_dark if hasattr(self.theme_cls, "bg_dark") else (0, 0, 0, 0.25)
-            back_item.padding = (4, 4, 4, 4)
+            self._latency_overlay.bind(texture_size=self._place_latency_overlay)
+            Window.bind(size=self._place_latency_overlay)
+            self.add_widget(self._latency_overlay)
+        if self._latency_event is None:
+            self._latency_event = Clock.schedule_interval(self._refresh_latency_overlay, interval)
+
+    def hide_latency_overlay(self):
+        if self._latency_event is not None:
+            self._latency_event.cancel()
+            self._latency_event = None
+        if self._latency_overlay is not None:
+            Window.unbind(size=self._place_latency_overlay)
+            self.remove_widget(self._latency_overlay)
+            self._latency_overlay = None
+
+    def _refresh_latency_overlay(self, dt):
+        monitor = _latency
+        self._latency_overlay.text = monitor.summary() if monitor is not None else ""
+
+    def _place_latency_overlay(self, *args):
+        label = self._latency_overlay
+        label.size = label.texture_size
+        label.pos = (dp(10), Window.height - label.height - dp(10))
+
+
+    # --- Cache des niveaux de menu ---------------------------------------
+    def set_menu_config(self, menu_config):
+        """
+        Remplace la configuration racine ; les niveaux en cache, dont le
+        niveau affiché, sont patchés ligne par ligne. À rappeler avec le même
+        objet après une modification en place de menu_config : le menu n'est
+        recompilé que lorsque menu_config change d'identité.
+        """
+        self.menu_config = menu_config
+        displayed = self.menu_layout if self.mtx and not self._closing else None
+        self._compile_menu()
+        if displayed is not None:
+            self._refresh_open_menu(displayed)
+        self._update_voice_vocabulary()
+
+    def _refresh_open_menu(self, displayed):
+        """
+        Menu ouvert après patch : la carte est redimensionnée (bord haut fixe)
+        si le nombre de lignes a changé ; si le niveau affiché a disparu ou
+        change de mode (virtualisé ou non), il est rouvert à la même position.
+        """
+        virtual = getattr(displayed, "mefu_rv", None) is not None
+        entry = self._level_cache.get((self.current_node, virtual))
+        if entry is None or entry["layout"] is not displayed or self._level_is_virtual(self.current_node) != virtual:
+            self._cleanup_menu(self)
+            self.sub.show_context_menu(self.sub.pos, self)
+            return
+        if self._hovered_row is not None and self._hovered_row.parent is None:
+            self._hovered_row = None
+        self._resize_open_card(len(self.current_node.children) + bool(self.menu_history))
+        for row in self._level_cards(displayed):
+            row.opacity = 1
+        self._invalidate_row_index()
+
+    def watch_menu_file(self, path, interval=1.0):
+        """
+        Recharge le menu à chaud depuis un fichier JSON / YAML (voir
+        MenuFileWatcher) ; historique et position sont conservés si le
+        chemin courant existe toujours.
+        """
+        self.stop_watching_menu_file()
+        self.menu_watcher = MenuFileWatcher(path, self.set_menu_config, interval)
+        self.menu_watcher.start()
+        return self.menu_watcher
+
+    def stop_watching_menu_file(self):
+        if self.menu_watcher is not None:
+            self.menu_watcher.stop()
+            self.menu_watcher = None
+
+    def invalidate_menu_cache(self):
+        self._cancel_prefetch()
+        for entry in self._level_cache.values():
+            self._release_level(entry["layout"])
+        self._level_cache.clear()
+
+    def _get_level(self, node, virtual=False):
+        """
+        Renvoie le MDBoxLayout du niveau `node`, construit une seule fois puis
+        réutilisé d'une ouverture à l'autre.
+        """
+        key = (node, virtual)
+        entry = self._level_cache.pop(key, None)
+        if entry is None:
+            prefetch = self._prefetch
+            if prefetch is not None and prefetch["key"] == key:
+                # Préconstruction en cours : on la termine plutôt que de repartir de zéro
+                # (le générateur peut être déjà épuisé : dernier layout conservé)
+                self._prefetch = None
+                self._prefetch_trigger.cancel()
+                layout = prefetch["layout"]
+                for layout in prefetch["steps"]:
+                    pass
+            else:
+                with_back = node.parent is not None
+                if virtual:
+                    layout = self._build_virtual_level(node.children, with_back)
+                else:
+                    layout = self._build_level(node.children, with_back)
+            entry = self._level_entry(node, layout)
+        # Réinsertion en fin de dict : ordre LRU pour l'éviction
+        self._level_cache[key] = entry
+        self._evict_levels(key)
+        layout = entry["layout"]
+        if layout.parent is not None:
+            layout.parent.remove_widget(layout)
+        rv = getattr(layout, "mefu_rv", None)
+        if rv is not None:
+            rv.scroll_y = 1
+        for card in self._level_cards(layout):
+            self._style_row(card)
+            card.opacity = 1
+        return layout
+
+    def _level_entry(self, node, layout):
+        return {"node": node, "layout": layout,
+                "rows": self._level_rows(node, layout)}
+
+    @staticmethod
+    def _level_rows(node, layout):
+        # Coût mémoire approché : nombre de lignes construites (vues recyclées exclues)
+        if getattr(layout, "mefu_rv", None) is not None:
+            return len(layout.children)
+        return len(node.children) + (node.parent is not None)
+
+    def _evict_levels(self, keep):
+        """
+        Libère les niveaux les moins récemment utilisés au-delà de
+        level_cache_rows, sauf le niveau affiché et `keep` (celui qui vient
+        d'être demandé ou préconstruit, pas encore affiché).
+        """
+        total = sum(entry["rows"] for entry in self._level_cache.values())
+        if total <= self.level_cache_rows:
+            return
+        for key, entry in list(self._level_cache.items()):
+            if total <= self.level_cache_rows:
+                break
+            if key == keep or entry["layout"] is self.menu_layout:
+                continue
+            del self._level_cache[key]
+            self._release_level(entry["layout"])
+            total -= entry["rows"]
+
+    # --- Préconstruction des sous-menus survolés ---------------------------
+    # Budget par image (s) consacré à la construction spéculative
+    PREFETCH_BUDGET = 0.004
+
+    def _level_is_virtual(self, node):
+        rows = len(node.children) + (node.parent is not None)
+        return rows * 60 + 30 > self._menu_height_limit()
+
+    def _prefetch_level(self, node):
+        """
+        Survol d'un item à sous-menu : son niveau est construit par tranches
+        (une carte à la fois, PREFETCH_BUDGET par image) pour que l'entrée
+        dans le sous-menu ne soit plus qu'un échange de layout.
+        """
+        if not self.prefetch or not node.children:
+            return
+        key = (node, self._level_is_virtual(node))
+        if key in self._level_cache:
+            return
+        if self._prefetch is not None:
+            if self._prefetch["key"] == key:
+                return
+            self._cancel_prefetch()
+        with_back = node.parent is not None
+        if key[1]:
+            steps = iter((self._build_virtual_level(node.children, with_back),))
+        else:
+            steps = self._iter_build_level(node.children, with_back)
+        self._prefetch = {"key": key, "steps": steps, "layout": None}
+        self._prefetch_trigger()
+
+    def _prefetch_step(self, dt):
+        prefetch = self._prefetch
+        if prefetch is None:
+            return
+        deadline = time.perf_counter() + self.PREFETCH_BUDGET
+        for layout in prefetch["steps"]:
+            prefetch["layout"] = layout
+            if time.perf_counter() >= deadline:
+                self._prefetch_trigger()
+                return
+        self._prefetch = None
+        node = prefetch["key"][0]
+        self._level_cache[prefetch["key"]] = self._level_entry(node, prefetch["layout"])
+        self._evict_levels(prefetch["key"])
+
+    def _cancel_prefetch(self):
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is not None:
+            self._prefetch_trigger.cancel()
+            if prefetch["layout"] is not None:
+                self._release_level(prefetch["layout"])
+
+    def _on_mouse_pos(self, window, pos):
+        if not self.mtx or self.menu_card is None or not self.menu_card.collide_point(*pos):
+            return
+        row = self._row_at(pos)
+        node = getattr(row, "mefu_node", None)
+        if node is not None and node.children:
+            self._prefetch_level(node)
+
+    @staticmethod
+    def _level_cards(layout):
+        rv = getattr(layout, "mefu_rv", None)
+        for child in layout.children:
+            if child is rv:
+                if rv.layout_manager:
+                    yield from rv.layout_manager.children
+            else:
+                yield child
+
+    @staticmethod
+    def _node_signature(node):
+        return (node.name, node.icon, node.handler_name, bool(node.children))
+
+    def _build_level(self, nodes, with_back):
+        for layout in self._iter_build_level(nodes, with_back):
+            pass
+        return layout
+
+    def _iter_build_level(self, nodes, with_back):
+        """Construction pas à pas : renvoie le layout après chaque carte ajoutée."""
+        layout = MDBoxLayout(
+            orientation="vertical",
+            padding=[15, 24, 15, 15],  # valeur par défaut (sans sous-menu)
+            spacing=10
+        )
+        if with_back:
             # Ajuste le padding top quand 'Retour' est présent pour ne PAS ajouter d'espace excessif
-            pad = list(self.menu_layout.padding)
+            pad = list(layout.padding)
             pad[1] = 15   # même top que les autres menus (au lieu de 24)
-            self.menu_layout.padding = pad
+            layout.padding = pad
+            layout.add_widget(self._make_back_card())
+        yield layout
+        for node in nodes:
+            layout.add_widget(self._make_item_card(node))
+            yield layout
+
+    def _build_virtual_level(self, nodes, with_back):
+        """
+        Niveau virtualisé pour les très grands menus : une RecycleView dont
+        seules les lignes visibles existent en tant que widgets.
+        """
+        layout = MDBoxLayout(
+            orientation="vertical",
+            padding=[15, 15 if with_back else 24, 15, 15],
+            spacing=10
+        )
+        if with_back:
+            layout.add_widget(self._make_back_card())
+        rv = RecycleView(do_scroll_x=False, bar_width=dp(4), scroll_type=["bars", "content"])
+        rv.fbind("scroll_y", self._on_rows_scrolled)
+        rv_layout = RecycleBoxLayout(
+            orientation="vertical",
+            default_size=(None, 50),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=10,
+        )
+        rv_layout.bind(minimum_height=rv_layout.setter("height"))
+        rv.add_widget(rv_layout)
+        # viewclass est porté par le layout manager : à fixer après add_widget
+        rv.viewclass = self.MenuRow
+        rv.data = [{"owner": self, "node": node} for node in nodes]
+        layout.add_widget(rv)
+        layout.mefu_rv = rv
+        return layout
+
+    def _sync_level(self, entry, matches):
+        """
+        Patch incrémental d'un niveau en cache après recompilation : chaque
+        ligne suit le nœud qui lui correspond (`matches`, ancien -> nouveau),
+        quelle que soit sa nouvelle position ; seules les lignes modifiées
+        sont reconfigurées, puis remises dans le nouvel ordre.
+        """
+        parent = entry["node"]
+        nodes = parent.children
+        layout = entry["layout"]
+        rv = getattr(layout, "mefu_rv", None)
+        if rv is not None:
+            rv.data = [{"owner": self, "node": node} for node in nodes]
+            return
+        # Ordre visuel (haut -> bas), sans la carte 'Retour'
+        rows = [c for c in reversed(layout.children) if not getattr(c, "mefu_is_back", False)]
+        by_node, free = {}, []
+        for row in rows:
+            node = matches.get(row.mefu_node)
+            if node is not None and node.parent is parent and node not in by_node:
+                by_node[node] = row
+            else:
+                free.append(row)
+        free.reverse()
+        ordered = []
+        for node in nodes:
+            row = by_node.pop(node, None)
+            if row is not None:
+                if self._node_signature(row.mefu_node) != self._node_signature(node):
+                    self._configure_item_card(row, node)
+                else:
+                    row.mefu_node = node
+            elif free:
+                row = free.pop()
+                self._configure_item_card(row, node)
+            else:
+                row = self._make_item_card(node)
+            ordered.append(row)
+        for card in free:
+            layout.remove_widget(card)
+            self._card_pool.append(card)
+        # children = ordre inverse de l'affichage ; 'Retour' reste en tête.
+        # Les lignes déjà dans le bon ordre relatif (plus longue sous-suite
+        # croissante) restent en place ; les autres passent par remove_widget /
+        # add_widget pour garder l'ordre du canvas cohérent avec children.
+        desired = ordered[::-1]
+        position = {id(row): index for index, row in enumerate(layout.children)}
+        placed = [row for row in desired if row.parent is not None]
+        kept = _longest_increasing([position[id(row)] for row in placed])
+        for index, row in enumerate(placed):
+            if index not in kept:
+                layout.remove_widget(row)
+        for index, row in enumerate(desired):
+            if row.parent is None:
+                layout.add_widget(row, index=index)
+
+    def _release_level(self, layout):
+        if layout.parent is not None:
+            layout.parent.remove_widget(layout)
+        rv = getattr(layout, "mefu_rv", None)
+        if rv is not None:
+            rv.data = []
+        for child in list(layout.children):
+            layout.remove_widget(child)
+            # Seules les cartes d'items classiques retournent dans la réserve
+            if getattr(child, "mefu_is_back", None) is False:
+                self._card_pool.append(child)
 
-            back_item.opacity = 1
-            back_item.add_widget(back_icon)
-            back_item.add_widget(back_label)
-            self.menu_layout.add_widget(back_item)
-        for item in self.menu_config["menu"]["items"]:
+    def _make_back_card(self):
+        back_item = MDCard(
+            orientation="horizontal",
+            spacing=15,
+            size_hint_y=None,
+            height=50,
+            radius=[10],
+            md_bg_color=self.theme_cls.bg_normal,
+            ripple_behavior=True,
+            ripple_color=(0, 0, 0, 0.2)
+        )
+        back_icon = MDIconButton(
+            icon="arrow-left",
+            theme_text_color="Custom",
+            text_color=self.theme_cls.accent_color,
+            size_hint=(None, None),
+            size=(dp(40), dp(40)),
+            pos_hint={"center_y": 0.5},
+            on_release=lambda x: self._go_back()
+        )
+        back_label = MDLabel(
+            text="Retour",
+            theme_text_color="Custom",
+            text_color=self.theme_cls.text_color,
+            halign="left",
+            size_hint=(1, None),
+            height=dp(40),
+            pos_hint={"center_y": 0.5},
+        )
+        back_item.padding = (4, 4, 4, 4)
+        back_item.opacity = 1
+        back_item.add_widget(back_icon)
+        back_item.add_widget(back_label)
+        back_item.mefu_is_back = True
+        back_item.mefu_icon = back_icon
+        back_item.mefu_label = back_label
+        self._style_row(back_item)
+        return back_item
+
+    def _make_item_card(self, node):
+        if self._card_pool:
+            item_card = self._card_pool.pop()
+        else:
             item_card = MDCard(
                 orientation="horizontal",
                 spacing=15,
@@ -240,19 +2431,16 @@ class MeFu(FloatLayout):
                 ripple_color=(0, 0, 0, 0.2)
             )
             item_card.bind(on_touch_down=self.sub._on_item_touch)
-            handler = item.get("handler")
             icon_button = MDIconButton(
-                icon=item["icon"],
                 theme_text_color="Custom",
                 text_color=self.theme_cls.accent_color,
                 size_hint=(None, None),
                 size=(dp(40), dp(40)),
                 pos_hint={"center_y": 0.5},
-                on_release=lambda x, handler=handler: self._execute_action(handler) if handler else None,
+                on_release=lambda x, card=item_card: self._execute_node(card.mefu_node) if card.mefu_node.handler_name else None,
             )
             icon_button.bind(on_touch_down=lambda inst, touch: True)
             label = MDLabel(
-                text=item["name"],
                 theme_text_color="Custom",
                 text_color=self.theme_cls.text_color,
                 halign="left",
@@ -262,22 +2450,32 @@ class MeFu(FloatLayout):
             )
             item_card.add_widget(icon_button)
             item_card.add_widget(label)
-            self.menu_layout.add_widget(item_card)
-        # Normalisation des hauteurs et alignements (évite décalages visuels)
-        for child in self.menu_layout.children:
-            if isinstance(child, MDCard):
-                child.height = 50
-        # Si on est dans un sous-menu, garantir l'opacité de 'Retour'
-        if self.menu_history and self.menu_layout.children:
-            self.menu_layout.children[-1].opacity = 1
-        self.menu_card.add_widget(self.menu_layout)
-        parent_layout.add_widget(self.menu_card)
-        Window.bind(on_touch_down=lambda inst, touch: self._global_touch(touch))
-        from kivy.animation import Animation
-        anim_open = Animation(size=(menu_width, menu_height), d=0.3, t="out_cubic")
-        anim_open.bind(on_progress=self._show_items_progressivement)
-        anim_open.start(self.menu_card)
-        
+            item_card.mefu_is_back = False
+            item_card.mefu_icon = icon_button
+            item_card.mefu_label = label
+        self._configure_item_card(item_card, node)
+        return item_card
+
+    def _configure_item_card(self, item_card, node):
+        item_card.mefu_node = node
+        item_card.mefu_icon.icon = node.icon
+        item_card.mefu_label.text = node.name
+        item_card.height = 50
+        self._style_row(item_card)
+
+    def _style_row(self, card):
+        if card.mefu_is_back:
+            card.md_bg_color = self.theme_cls.bg_dark if hasattr(self.theme_cls, "bg_dark") else (0, 0, 0, 0.25)
+        else:
+            card.md_bg_color = self.theme_cls.bg_normal
+        card.mefu_icon.text_color = self.theme_cls.accent_color
+        card.mefu_label.text_color = self.theme_cls.text_color
+
+    def _on_theme_change(self, *args):
+        # Recoloration en place des niveaux en cache, sans reconstruction
+        for entry in self._level_cache.values():
+            for card in self._level_cards(entry["layout"]):
+                self._style_row(card)
 
     def _global_touch(self, touch):
         if touch.button == "left":
@@ -287,89 +2485,273 @@ class MeFu(FloatLayout):
 
     def _close_menu(self, parent_layout):
         if self.menu_card and self.menu_card in parent_layout.children:
-            from kivy.animation import Animation
             if self._b_anim:
-                anim_shrink = Animation(
-                    size=(self.menu_card.size[0], 15),
-                    pos=(self.menu_card.pos[0], self.menu_card.pos[1] + self.menu_card.size[1] - 15),
-                    d=0.2,
-                    t="out_cubic",
-                )
-                anim_shrink.bind(on_progress=self._hide_items_progressivement)
-                anim_shrink.bind(on_complete=self._to_circle_phase)
-                anim_shrink.start(self.menu_card)
+                if self._closing:
+                    return
+                from kivy.animation import Animation
+                card = self.menu_card
+                Animation.cancel_all(card)
+                self._closing = True
+                self._close_from = (tuple(card.pos), tuple(card.size))
+                self._plan_reveal(offset=0, keep_back=False, height=card.height)
+                # Une seule Animation (sans propriété) pour les trois phases ;
+                # la géométrie est calculée dans _close_progress
+                anim_close = Animation(d=self.CLOSE_DURATION)
+                anim_close.bind(on_progress=self._close_progress)
+                anim_close.bind(on_complete=self._cleanup_menu)
+                anim_close.start(card)
             else:
                 self._cleanup_menu(parent_layout)
 
+    # --- Animation des lignes ----------------------------------------------
+    # Fermeture : repli en bandeau (0.2 s), réduction en cercle (0.2 s), puis
+    # disparition (0.3 s), chaque phase en out_cubic.
+    CLOSE_PHASES = (0.2, 0.2, 0.3)
+    CLOSE_DURATION = sum(CLOSE_PHASES)
+
+    def _reveal_source_len(self):
+        # Nombre de lignes construites : change quand la RecycleView crée ses vues
+        rv = getattr(self.menu_layout, "mefu_rv", None)
+        if rv is not None and rv.layout_manager is not None:
+            return len(rv.layout_manager.children) + len(self.menu_layout.children)
+        return len(self.menu_layout.children)
+
+    def _plan_reveal(self, offset, keep_back, height):
+        """
+        Seuils d'apparition précalculés : la ligne d'index i (de bas en haut)
+        est visible dès que la carte dépasse (i + 1) * 60 - offset. 'Retour'
+        reste visible à l'ouverture d'un sous-menu (keep_back). Quand la carte
+        est plafonnée (`height` : hauteur finale à l'ouverture, initiale à la
+        fermeture), le pas est réduit pour que toutes les lignes construites,
+        y compris les vues recyclées hors de la RecycleView, tiennent dessous.
+        """
+        rows = list(self._visible_rows())
+        if keep_back and self.menu_history and rows:
+            rows.pop().opacity = 1
+        step = 60
+        if rows:
+            step = min(step, (height - 30 + offset) / len(rows))
+        self._reveal_rows = rows
+        self._reveal_thresholds = [(index + 1) * step - offset for index in range(len(rows))]
+        self._reveal_count = None
+        self._reveal_key = (self.menu_layout, self._reveal_source_len(), offset, keep_back)
+
+    def _reveal_to(self, height):
+        """Ne modifie que les lignes dont la visibilité change depuis l'image précédente."""
+        count = bisect_left(self._reveal_thresholds, height)
+        previous = self._reveal_count
+        rows = self._reveal_rows
+        if previous is None:
+            for index, row in enumerate(rows):
+                row.opacity = 1 if index < count else 0
+        elif count > previous:
+            for row in rows[previous:count]:
+                row.opacity = 1
+        elif count < previous:
+            for row in rows[count:previous]:
+                row.opacity = 0
+        self._reveal_count = count
+
     def _show_items_progressivement(self, animation, widget, progress):
         """
-        Animation d'apparition :
-        - Rend immédiatement visible l'item 'Retour' (index le plus haut dans children)
-          afin qu'il ne disparaisse pas pendant l'ouverture.
-        - Les autres items apparaissent progressivement comme avant.
-        """
-        if self.menu_layout and self.menu_card:
-            total_height = self.menu_card.size[1]
-            total_children = len(self.menu_layout.children)
-            for index, child in enumerate(self.menu_layout.children):
-                # L'ordre est inversé: le dernier ajouté est en haut visuellement.
-                # On calcule une hauteur seuil différente pour le premier (back) item.
-                is_back_candidate = bool(self.menu_history) and (index == total_children - 1)
-                if is_back_candidate:
-                    # Toujours visible dans un sous-menu
-                    child.opacity = 1
-                else:
-                    # Seuil classique (index+1)*60 mais on adoucit légèrement ( -10 )
-                    item_position = (index + 1) * 60 - 10
-                    child.opacity = 1 if total_height > item_position else 0
+        Apparition des lignes pendant l'ouverture : 'Retour' visible d'emblée,
+        les autres dès que la carte atteint leur seuil (index + 1) * 60 - 10.
+        """
+        if not (self.menu_layout and self.menu_card):
+            return
+        key = self._reveal_key
+        if key is None or key[0] is not self.menu_layout or key[1] != self._reveal_source_len():
+            self._plan_reveal(offset=10, keep_back=True, height=self._reveal_height)
+        self._reveal_to(self.menu_card.height)
 
-    def _hide_items_progressivement(self, animation, widget, progress):
+    def _close_progress(self, animation, card, progress):
+        from kivy.animation import AnimationTransition
+        (x0, y0), (w0, h0) = self._close_from
+        shrink, circle, vanish = self.CLOSE_PHASES
+        elapsed = progress * self.CLOSE_DURATION
+        top = y0 + h0 - 15
+        if elapsed < shrink:
+            e = AnimationTransition.out_cubic(elapsed / shrink)
+            card.size = (w0, h0 + (15 - h0) * e)
+            card.pos = (x0, y0 + (h0 - 15) * e)
+        elif elapsed < shrink + circle:
+            e = AnimationTransition.out_cubic((elapsed - shrink) / circle)
+            card.size = (w0 + (15 - w0) * e, 15)
+            card.pos = (x0 + (w0 - 15) / 2 * e, top)
+        else:
+            e = AnimationTransition.out_cubic(min(1.0, (elapsed - shrink - circle) / vanish))
+            card.size = (15 * (1 - e), 15 * (1 - e))
+            card.pos = (x0 + (w0 - 15) / 2, top)
         if self.menu_layout:
-            total_height = self.menu_card.size[1] if self.menu_card else 0
-            for index, child in enumerate(self.menu_layout.children):
-                item_position = total_height - (index + 1) * 60
-                child.opacity = 1 if item_position > 0 else 0
-
-    def _to_circle_phase(self, *args):
-        if self._b_anim and self.menu_card:
-            from kivy.animation import Animation
-            anim_circle = Animation(
-                size=(15, 15),
-                pos=(self.menu_card.pos[0] + (self.menu_card.size[0] - 15) / 2, self.menu_card.pos[1]),
-                d=0.2,
-                t='out_cubic'
-            )
-            anim_circle.bind(on_complete=self._close_circle)
-            anim_circle.start(self.menu_card)
-
-    def _close_circle(self, *args):
-        if self._b_anim and self.menu_card:
-            from kivy.animation import Animation
-            anim_close = Animation(size=(0, 0), d=0.3, t='out_cubic')
-            anim_close.bind(on_complete=self._cleanup_menu)
-            anim_close.start(self.menu_card)
+            self._reveal_to(card.height)
 
     def _cleanup_menu(self, *args):
-        if self.menu_card and self.menu_layout in self.menu_card.children:
-            self.menu_card.remove_widget(self.menu_layout)
-        Window.unbind(on_touch_down=self._global_touch)
+        if self.menu_card and self.menu_layout in self.menu_card.mefu_host.children:
+            self.menu_card.mefu_host.remove_widget(self.menu_layout)
+        OutsideTouchDispatcher.unregister(self)
         if self.menu_card and self.menu_card.parent:
             self.menu_card.parent.remove_widget(self.menu_card)
+        self._set_hovered(None)
+        self._invalidate_row_index()
+        self._reveal_rows = []
+        self._reveal_key = None
+        self._closing = False
+        self._search_saved = None
+        if self._search_field is not None and self._search_field.text:
+            self._search_resetting = True
+            self._search_field.text = ""
+            self._search_resetting = False
         self.menu_card = None
         self.mtx = False
+        self._notify_menu_state()
+
+    def _notify_menu_state(self):
+        # La caméra repasse à pleine cadence tant que le menu est ouvert
+        camera_widget = getattr(self, "camera_widget", None)
+        if camera_widget:
+            camera_widget.set_menu_open(self.mtx)
+        # Grammaire vocale du niveau affiché (ou des seules commandes d'ouverture)
+        self._update_voice_vocabulary()
+
+    # --- Commandes vocales -----------------------------------------------
+    # Phrases réservées ; tout autre phrase reconnue est un libellé du niveau courant
+    VOICE_COMMANDS = {
+        "open": ("menu", "ouvrir"),
+        "close": ("fermer",),
+        "back": ("retour",),
+    }
+
+    def enable_voice(self, **options):
+        """Démarre la reconnaissance vocale (modèle chargé en arrière-plan)."""
+        if self.voice is None:
+            self.voice = VoiceCommandEngine(self.voice_callback, **{**self.voice_options, **options})
+            self._update_voice_vocabulary()
+            self.voice.start()
+        return self.voice
+
+    def disable_voice(self):
+        if self.voice is not None:
+            self.voice.stop()
+            self.voice = None
+
+    def _voice_targets(self):
+        """Phrase parlée -> nœud, pour le niveau courant."""
+        node, targets = self._voice_targets_cache
+        if node is not self.current_node:
+            targets = {voice_phrase(child.name): child for child in self.current_node.children}
+            self._voice_targets_cache = (self.current_node, targets)
+        return targets
+
+    def _update_voice_vocabulary(self):
+        if getattr(self, "voice", None) is None:
+            return
+        commands = self.VOICE_COMMANDS
+        if not self.mtx:
+            phrases = list(commands["open"])
+        else:
+            phrases = list(commands["close"]) + list(self._voice_targets())
+            if self.menu_history:
+                phrases += commands["back"]
+        self.voice.set_vocabulary(phrases)
+
+    def voice_callback(self, phrase):
+        """Phrase reconnue (thread Kivy) : même effet que le geste équivalent."""
+        commands = self.VOICE_COMMANDS
+        if not self.mtx:
+            if phrase in commands["open"]:
+                self.gesture_callback("open_menu", (0, 0))
+            return
+        node = self._voice_targets().get(phrase)
+        if node is not None:
+            self._select_node(node)
+        elif phrase in commands["close"]:
+            self.gesture_callback("swipe_right", (0, 0))
+        elif phrase in commands["back"] and self.menu_history:
+            self._go_back()
+
+    def _select_node(self, node):
+        """Sélection d'un nœud du niveau courant, comme un clic sur sa ligne."""
+        for row in self._visible_rows():
+            if getattr(row, "mefu_node", None) is node:
+                self._set_hovered(row)
+                break
+        if node.children:
+            self._enter_node(node)
+        else:
+            self._execute_node(node)
 
     def _execute_action(self, handler_name):
         if handler_name in self.action_methods:
-            self.action_methods[handler_name]()
+            return self._run_traced(handler_name, self.action_methods[handler_name])
         else:
             print(f"Handler {handler_name} introuvable.")
 
+    def _execute_node(self, node):
+        # Handler résolu à la compilation / à l'add_action : pas de recherche par nom
+        if node.action is not None:
+            return self._run_traced(node.handler_name, node.action)
+        else:
+            print(f"Handler {node.handler_name} introuvable.")
+
+    def _run_traced(self, handler_name, action):
+        tracer = _tracer
+        if tracer is None:
+            return action()
+        start = tracer.begin()
+        flags = 0
+        try:
+            return action()
+        except BaseException:
+            flags = _trace().ERROR
+            raise
+        finally:
+            tracer.record(_trace().ACTION, start, tracer.name_id(handler_name), flags)
+
+    def _enter_node(self, node):
+        """
+        Descend dans le sous-menu `node` (historique = pile de nœuds). Pour un
+        nœud hors du niveau courant (résultat de recherche), l'historique
+        devient le chemin de la racine jusqu'à son parent.
+        """
+        tracer = _tracer
+        if tracer is None:
+            return self._open_node(node)
+        start = tracer.begin()
+        try:
+            return self._open_node(node)
+        finally:
+            tracer.record(_trace().ENTER, start, tracer.name_id(node.path_id))
+
+    def _open_node(self, node):
+        if node.parent is self.current_node:
+            self.menu_history.append(self.current_node)
+        else:
+            history = []
+            parent = node.parent
+            while parent is not None:
+                history.append(parent)
+                parent = parent.parent
+            self.menu_history = history[::-1]
+        self.current_node = node
+        self._cleanup_menu(self)
+        self.sub.show_context_menu(self.sub.pos, self)
+
     def _go_back(self):
-        if self.menu_history:
-            prev_config = self.menu_history.pop()
-            self.menu_config = prev_config
-            self._cleanup_menu(self)
-            self.sub.show_context_menu(self.sub.pos, self)
+        if not self.menu_history:
+            return
+        tracer = _tracer
+        if tracer is None:
+            return self._pop_level()
+        start = tracer.begin()
+        try:
+            return self._pop_level()
+        finally:
+            tracer.record(_trace().BACK, start, len(self.menu_history))
+
+    def _pop_level(self):
+        self.current_node = self.menu_history.pop()
+        self._cleanup_menu(self)
+        self.sub.show_context_menu(self.sub.pos, self)
 
     class SubMeFu:
         def __init__(self, parent):
@@ -378,9 +2760,12 @@ class MeFu(FloatLayout):
 
         def show_context_menu(self, pos, layout):
             if not self.parent.mtx:
+                if _latency is not None:
+                    self.parent._open_started = time.perf_counter()
                 self.pos = pos
                 self.parent._create_context_menu(pos, layout)
                 self.parent.mtx = True
+                self.parent._notify_menu_state()
 
         def close_menu(self, layout):
             self.parent._close_menu(layout)
@@ -395,42 +2780,57 @@ class MeFu(FloatLayout):
                 instance.md_bg_color = self.parent.theme_cls.accent_light
                 from kivy.animation import Animation
                 Animation(md_bg_color=original_color, d=0.3).start(instance)
-                total_children = len(self.parent.menu_layout.children)
-                reversed_index = total_children - self.parent.menu_layout.children.index(instance) - 1
-                if self.parent.menu_history and reversed_index == 0:
+                if getattr(instance, "mefu_is_back", False):
                     self.parent._go_back()
                     return
-                config_index = reversed_index - 1 if self.parent.menu_history else reversed_index
-                try:
-                    item = self.parent.menu_config["menu"]["items"][config_index]
-                except IndexError:
-                    print("Index error: config_index out of range", config_index)
-                    return
-#                if "children" in item and item["children"]:
-#                    self.parent.menu_history.append(self.parent.menu_config)
-#                    new_menu_config = {"menu": {"items": item["children"]}}
-#                    self.parent.menu_config = new_menu_config
-#                    self.parent._cleanup_menu(self.parent)
-#                    self.show_context_menu(self.pos, self.parent)
-
-                if "children" in item and item["children"]:
-                    # Empile la configuration actuelle
-                    self.parent.menu_history.append(self.parent.menu_config)
-                    # Nouvelle config = sous-items
-                    new_menu_config = {"menu": {"items": item["children"]}}
-                    self.parent.menu_config = new_menu_config
-                    # Nettoie l'ancien menu
-                    self.parent._cleanup_menu(self.parent)
-                    # Réouvre à la même position
-                    self.show_context_menu(self.pos, self.parent)
+                node = instance.mefu_node
+                if node.children:
+                    # Réouvre à la même position avec le niveau enfant
+                    self.parent._enter_node(node)
                 else:
-                    handler_name = item.get("handler")
-                    if handler_name in self.parent.action_methods:
-                        self.parent.action_methods[handler_name]()
-                    else:
-                        print(f"Handler {handler_name} introuvable.")
+                    self.parent._execute_node(node)
                     self.parent._close_menu(instance.parent)
 
+    class MenuRow(RecycleDataViewBehavior, MDCard):
+        """Ligne recyclée du mode virtualisé (viewclass de la RecycleView)."""
+        def __init__(self, **kwargs):
+            super().__init__(
+                orientation="horizontal",
+                spacing=15,
+                size_hint_y=None,
+                height=50,
+                radius=[10],
+                ripple_behavior=True,
+                ripple_color=(0, 0, 0, 0.2),
+                **kwargs
+            )
+            self.owner = None
+            self.mefu_is_back = False
+            self.mefu_node = None
+            self.mefu_icon = MDIconButton(
+                theme_text_color="Custom",
+                size_hint=(None, None),
+                size=(dp(40), dp(40)),
+                pos_hint={"center_y": 0.5},
+                on_release=lambda x: self.owner._execute_node(self.mefu_node) if self.mefu_node.handler_name else None,
+            )
+            self.mefu_icon.bind(on_touch_down=lambda inst, touch: True)
+            self.mefu_label = MDLabel(
+                theme_text_color="Custom",
+                halign="left",
+                size_hint=(1, None),
+                height=dp(40),
+                pos_hint={"center_y": 0.5},
+            )
+            self.add_widget(self.mefu_icon)
+            self.add_widget(self.mefu_label)
+            self.bind(on_touch_down=lambda inst, touch: self.owner.sub._on_item_touch(inst, touch) if self.owner else None)
+
+        def refresh_view_attrs(self, rv, index, data):
+            self.owner = data["owner"]
+            self.owner._configure_item_card(self, data["node"])
+            self.opacity = 1
+
     class FakeTouch(MotionEvent):
         def __init__(self, pos):
             super().__init__("fake", 0, {})
@@ -445,64 +2845,80 @@ class MeFu(FloatLayout):
             pass
 
     class CameraWidget(Image):
-        def __init__(self, gesture_callback, **kwargs):
+        """
+        Aperçu caméra + relais des gestes.
+        La capture et l'inférence MediaPipe tournent dans le GestureService
+        partagé (threads dédiés, une caméra et un modèle pour tout le
+        processus) ; ce widget ne fait qu'afficher la dernière image
+        disponible et relayer les gestes déjà ramenés sur le thread Kivy.
+        """
+        def __init__(self, gesture_callback, gesture_options=None, **kwargs):
             super().__init__(**kwargs)
-            self.capture = cv2.VideoCapture(0)
-            self.mp_hands = mp.solutions.hands
-            self.hands = self.mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=1,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5)
-            self.prev_wrist_x = None
-            self.prev_wrist_y = None
-            self.last_swipe_time = 0
             self.gesture_callback = gesture_callback
-            Clock.schedule_interval(self.update, 1.0/30)
+            self.service = GestureService.acquire(self._on_gesture, **(gesture_options or {}))
+            self.pipeline = self.service.pipeline
+            self.capture = self.pipeline.capture
+            self.mp_hands = self.pipeline.mp_hands
+            # Gestes fournis par le détecteur (voir GestureBackend)
+            self.capabilities = self.pipeline.capabilities
+            self._texture = None
+            self._frame_id = 0
+            self._update_event = Clock.schedule_interval(self.update, 1.0/30)
+
+        def _on_gesture(self, gesture, pos, select=False):
+            if not self.gesture_callback:
+                return
+            if gesture == "navigate":
+                self.gesture_callback(gesture, pos, select)
+            else:
+                self.gesture_callback(gesture, pos)
 
         def update(self, dt):
-            ret, frame = self.capture.read()
-            if ret:
-                frame = cv2.flip(frame, 1)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(rgb_frame)
-                frame_height, frame_width = frame.shape[:2]
-                current_time = time.time()
-                if results.multi_hand_landmarks:
-                    hand_landmarks = results.multi_hand_landmarks[0]
-                    wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-                    wrist_x = int(wrist.x * frame_width)
-                    wrist_y = int(wrist.y * frame_height)
-                    if self.prev_wrist_y is not None:
-                        dy = self.prev_wrist_y - wrist_y
-                        middle_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-                        middle_dist = ((middle_tip.x - wrist.x)**2 + (middle_tip.y - wrist.y)**2)**0.5
-                        if dy > 40 and (current_time - self.last_swipe_time) > 0.3 and wrist_y < frame_height * 0.9 and middle_dist > 0.1:
-                            self.last_swipe_time = current_time
-                            if self.gesture_callback:
-                                self.gesture_callback("open_menu", (wrist_x, frame_height - wrist_y))
-                    self.prev_wrist_y = wrist_y
-                    if self.prev_wrist_x is not None:
-                        dx = wrist_x - self.prev_wrist_x
-                        if dx > 40 and (current_time - self.last_swipe_time) > 1.0:
-                            self.last_swipe_time = current_time
-                            if self.gesture_callback:
-                                self.gesture_callback("swipe_right", (wrist_x, frame_height - wrist_y))
-                    self.prev_wrist_x = wrist_x
-                    index_finger = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                    index_x = int(index_finger.x * frame_width)
-                    index_y = int(index_finger.y * frame_height)
-                    nav_pos = (index_x, frame_height - index_y)
-                    thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-                    middle_finger = hand_landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-                    dx_thumb = thumb_tip.x - middle_finger.x
-                    dy_thumb = thumb_tip.y - middle_finger.y
-                    dist_thumb = (dx_thumb*dx_thumb + dy_thumb*dy_thumb) ** 0.5
-                    select = (dist_thumb < 0.02)
-                    if self.gesture_callback:
-                        self.gesture_callback("navigate", nav_pos, select)
-                buf = cv2.flip(frame, 0).tobytes()
-                texture = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
-                texture.blit_buffer(buf, colorfmt='bgr', bufferfmt='ubyte')
-                self.texture = texture
+            frame_id, frame = self.pipeline.latest_frame()
+            # Aperçu invisible ou image déjà affichée : aucun envoi vers le GPU
+            if frame is None or self.opacity == 0 or frame_id == self._frame_id:
+                return
+            self._frame_id = frame_id
+            height, width = frame.shape[:2]
+            if self._texture is None or self._texture.size != (width, height):
+                # Une seule texture par résolution ; le retournement vertical
+                # passe par les coordonnées de texture (pas de copie des pixels)
+                self._texture = Texture.create(size=(width, height), colorfmt='bgr')
+                self._texture.flip_vertical()
+                self.texture = self._texture
+            # Envoi direct du buffer numpy (BGR contigu, vue 1D sans copie)
+            self._texture.blit_buffer(frame.reshape(-1), colorfmt='bgr', bufferfmt='ubyte')
+            self.canvas.ask_update()
+
+        def set_menu_open(self, menu_open):
+            if self.service is not None:
+                self.service.set_menu_open(self._on_gesture, menu_open)
+
+        def cpu_stats(self):
+            return self.pipeline.cpu_stats()
+
+        def stop(self):
+            """Arrête l'aperçu et se désabonne (caméra libérée au dernier abonné)."""
+            if self._update_event is not None:
+                self._update_event.cancel()
+                self._update_event = None
+            if self.service is not None:
+                self.service.release(self._on_gesture)
+                self.service = None
+
+
+def headless_mefu(menu_config=None, **kwargs):
+    """
+    MeFu hors de toute boucle d'application (benchmarks, rejeu de traces).
+    Une MDApp est instanciée, sans être lancée, pour fournir theme_cls aux
+    widgets KivyMD. Pour une fenêtre hors écran, fixer SDL_VIDEODRIVER=offscreen
+    (et KIVY_NO_ARGS=1) avant d'importer ce module.
+    """
+    from kivy.app import App
 
+    app = App.get_running_app() or MDApp()
+    if menu_config is None:
+        menu_config = {"menu": {"items": [
+            {"name": f"Item {i}", "icon": "circle", "handler": f"h{i}"} for i in range(8)
+        ]}}
+    return MeFu(theme_cls=app.theme_cls, menu_config=menu_config, size=280, **kwargs)
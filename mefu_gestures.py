@@ -0,0 +1,586 @@
+"""
+Reconnaissance de gestes MeFu, indépendante de Kivy / OpenCV / MediaPipe.
+
+- GestureRecognizer : logique swipe / ouverture / sélection sur des tableaux
+  de landmarks normalisés (21, 2) ; recognize_batch() calcule les grandeurs
+  d'un flux entier en une passe NumPy.
+- HandTracker : suivi de plusieurs mains (un GestureRecognizer par main,
+  appariement d'une image à l'autre, main principale selon une politique,
+  gestes à deux mains en option).
+- LandmarkFilter : lissage One-Euro des 21 landmarks (une opération NumPy
+  par image) pour stabiliser le curseur virtuel.
+- LandmarkRecorder / load_landmarks : enregistrement binaire compact des
+  flux de landmarks (float16).
+- replay / score_events : rejoue un enregistrement vers un gesture_callback
+  (ex. MeFu.gesture_callback) et mesure coût par image et précision, sans
+  caméra (CI).
+"""
+import json
+import struct
+import time
+
+import numpy as np
+
+from mefu_stats import percentile
+
+# Indices MediaPipe Hands (HandLandmark) utilisés par la détection de gestes
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_TIP = 12
+NUM_LANDMARKS = 21
+
+GESTURES = ("open_menu", "swipe_right", "navigate")
+
+
+class LandmarkFilter:
+    """
+    Filtre One-Euro (Casiez et al.) appliqué d'un bloc aux landmarks (21, 2).
+
+    Coupure adaptative par coordonnée : min_cutoff (Hz) règle le tremblement
+    à l'arrêt (plus bas = plus stable), beta la réactivité aux mouvements
+    rapides (plus haut = moins de retard), d_cutoff le lissage de la vitesse.
+    Les valeurs par défaut sont pensées pour des coordonnées normalisées.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=5.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, points, t):
+        points = np.asarray(points, dtype=np.float32)
+        if self._x is None:
+            self._x = points.copy()
+            self._dx = np.zeros_like(points)
+            self._t = t
+            return self._x
+        dt = t - self._t
+        if dt <= 0:
+            return self._x
+        self._t = t
+        a_d = self._alpha(dt, self.d_cutoff)
+        self._dx = a_d * (points - self._x) / dt + (1.0 - a_d) * self._dx
+        a = self._alpha(dt, self.min_cutoff + self.beta * np.abs(self._dx))
+        self._x = a * points + (1.0 - a) * self._x
+        return self._x
+
+    def apply_batch(self, points, times):
+        """Flux (N, 21, 2) ; les images sans main (NaN) réinitialisent le filtre."""
+        out = np.array(points, dtype=np.float32, copy=True)
+        for i in range(len(out)):
+            if np.isnan(out[i, 0, 0]):
+                self.reset()
+                continue
+            out[i] = self(out[i], float(times[i]))
+        return out
+
+
+class GestureRecognizer:
+    """
+    Machine à états des gestes d'une main.
+
+    Les seuils reprennent ceux historiquement codés dans CameraWidget.update :
+    swipe vertical > 40 px (ouverture), swipe droit > 40 px (fermeture),
+    pouce / majeur < 0.02 (sélection). La sélection a une hystérésis : elle
+    n'est relâchée qu'au-delà de `select_release`.
+
+    `smoothing` (True, False ou paramètres de LandmarkFilter) lisse les
+    landmarks servant au curseur et à la sélection ; les swipes restent
+    calculés sur les positions brutes pour ne pas être amortis.
+    """
+
+    def __init__(self, swipe_px=40, open_cooldown=0.3, swipe_cooldown=1.0,
+                 open_max_y=0.9, open_min_spread=0.1, select_dist=0.02,
+                 select_release=0.03, smoothing=True):
+        self.swipe_px = swipe_px
+        self.open_cooldown = open_cooldown
+        self.swipe_cooldown = swipe_cooldown
+        self.open_max_y = open_max_y
+        self.open_min_spread = open_min_spread
+        self.select_dist = select_dist
+        self.select_release = max(select_release, select_dist)
+        if smoothing is True:
+            self.filter = LandmarkFilter()
+        elif smoothing:
+            self.filter = LandmarkFilter(**smoothing)
+        else:
+            self.filter = None
+        self.reset()
+
+    def reset(self):
+        self.prev_wrist_x = None
+        self.prev_wrist_y = None
+        self.last_swipe_time = 0
+        self.selecting = False
+        if self.filter is not None:
+            self.filter.reset()
+
+    def lost(self):
+        """Main perdue : le lissage repart de zéro et la sélection est relâchée."""
+        self.selecting = False
+        if self.filter is not None:
+            self.filter.reset()
+
+    @staticmethod
+    def features(points):
+        """
+        Grandeurs utiles à la reconnaissance, pour une image (21, 2) ou un
+        flux (N, 21, 2) : poignet, index, écart poignet-majeur, écart pouce-majeur.
+        """
+        points = np.asarray(points, dtype=np.float32)
+        wrist = points[..., WRIST, :]
+        middle = points[..., MIDDLE_FINGER_TIP, :]
+        return {
+            "wrist": wrist,
+            "index": points[..., INDEX_FINGER_TIP, :],
+            "spread": np.linalg.norm(middle - wrist, axis=-1),
+            "pinch": np.linalg.norm(points[..., THUMB_TIP, :] - middle, axis=-1),
+        }
+
+    def update(self, points, frame_width, frame_height, current_time):
+        """Gestes d'une image : liste de (gesture, pos, select)."""
+        f = self.features(points)
+        if self.filter is not None:
+            smooth = self.features(self.filter(points, current_time))
+            index, pinch = smooth["index"], smooth["pinch"]
+        else:
+            index, pinch = f["index"], f["pinch"]
+        return self._step(f["wrist"], index, float(f["spread"]), float(pinch),
+                          frame_width, frame_height, current_time)
+
+    def recognize_batch(self, points, times, frame_width, frame_height):
+        """
+        Flux complet (N, 21, 2) : les grandeurs sont calculées en une seule
+        opération vectorisée, seul l'anti-rebond reste séquentiel. Les images
+        sans main (NaN) sont ignorées. Renvoie [(t, gesture, pos, select)].
+        """
+        f = self.features(points)
+        present = ~np.isnan(f["wrist"][:, 0])
+        wrist, index = f["wrist"], f["index"]
+        spread, pinch = f["spread"], f["pinch"]
+        if self.filter is not None:
+            smooth = self.features(self.filter.apply_batch(points, times))
+            index, pinch = smooth["index"], smooth["pinch"]
+        events = []
+        for i in range(len(present)):
+            if not present[i]:
+                self.selecting = False
+                continue
+            t = float(times[i])
+            for gesture, pos, select in self._step(wrist[i], index[i], float(spread[i]), float(pinch[i]),
+                                                   frame_width, frame_height, t):
+                events.append((t, gesture, pos, select))
+        return events
+
+    def _step(self, wrist, index, spread, pinch, frame_width, frame_height, current_time):
+        events = []
+        wrist_x = int(wrist[0] * frame_width)
+        wrist_y = int(wrist[1] * frame_height)
+        if self.prev_wrist_y is not None:
+            dy = self.prev_wrist_y - wrist_y
+            if (dy > self.swipe_px and (current_time - self.last_swipe_time) > self.open_cooldown
+                    and wrist_y < frame_height * self.open_max_y and spread > self.open_min_spread):
+                self.last_swipe_time = current_time
+                events.append(("open_menu", (wrist_x, frame_height - wrist_y), False))
+        self.prev_wrist_y = wrist_y
+        if self.prev_wrist_x is not None:
+            dx = wrist_x - self.prev_wrist_x
+            if dx > self.swipe_px and (current_time - self.last_swipe_time) > self.swipe_cooldown:
+                self.last_swipe_time = current_time
+                events.append(("swipe_right", (wrist_x, frame_height - wrist_y), False))
+        self.prev_wrist_x = wrist_x
+        index_x = int(index[0] * frame_width)
+        index_y = int(index[1] * frame_height)
+        nav_pos = (index_x, frame_height - index_y)
+        events.append(("navigate", nav_pos, self._select(pinch)))
+        return events
+
+    def _select(self, pinch):
+        # Hystérésis : seuil d'entrée select_dist, seuil de sortie select_release
+        if self.selecting:
+            self.selecting = pinch < self.select_release
+        else:
+            self.selecting = pinch < self.select_dist
+        return self.selecting
+
+
+class HandTrack:
+    """État d'une main suivie : identifiant, latéralité, recognizer propre."""
+
+    def __init__(self, track_id, handedness, recognizer, wrist, t):
+        self.id = track_id
+        self.handedness = handedness
+        self.recognizer = recognizer
+        self.wrist = wrist
+        self.spread = 0.0
+        self.first_seen = t
+        self.last_seen = t
+
+
+class HandTracker:
+    """
+    Plusieurs mains dans l'image : chaque main garde son propre
+    GestureRecognizer (poignet précédent, lissage, sélection), si bien qu'une
+    seconde main ne provoque ni saut de curseur ni faux swipe.
+
+    - appariement : poignet le plus proche de l'image précédente (au plus
+      `match_dist`, coordonnées normalisées), une latéralité différente
+      pénalisée ; une piste non revue depuis `forget_after` s'est oubliée ;
+    - main principale (`primary`) : "sticky" (la première vue garde le
+      curseur jusqu'à être oubliée), "right" / "left" (cette main dès
+      qu'elle est visible, sinon sticky), "largest" (la plus grande à
+      l'image, donc la plus proche, avec 20 % d'hystérésis) ;
+    - seuls les gestes de la main principale sont émis ; avec `two_handed`,
+      le pincement d'une autre main sélectionne aussi (une main navigue,
+      l'autre valide).
+
+    Les grandeurs des mains d'une image sont calculées en une passe NumPy ;
+    il ne reste par main que le lissage et la machine à états.
+    """
+
+    POLICIES = ("sticky", "right", "left", "largest")
+
+    def __init__(self, max_hands=2, primary="sticky", two_handed=False, recognizer=None,
+                 match_dist=0.2, forget_after=0.5):
+        if primary not in self.POLICIES:
+            raise ValueError(f"politique de main principale inconnue : {primary!r} ({', '.join(self.POLICIES)})")
+        self.max_hands = max_hands
+        self.primary = primary
+        self.two_handed = two_handed
+        # Paramètres de chaque GestureRecognizer (ex. {"swipe_px": 60})
+        self.recognizer_options = dict(recognizer or {})
+        self.match_dist = match_dist
+        self.forget_after = forget_after
+        self.reset()
+
+    def reset(self):
+        self.tracks = []
+        self.primary_id = None
+        self._next_id = 0
+
+    def lost(self):
+        """Aucune main à l'image : sélections relâchées, lissages réinitialisés."""
+        for track in self.tracks:
+            track.recognizer.lost()
+
+    def update(self, hands, handedness, frame_width, frame_height, current_time):
+        """
+        Gestes d'une image à partir de `hands` (liste de (21, 2)) et de leur
+        latéralité ("Left" / "Right", ou None si inconnue). Même format que
+        GestureRecognizer.update : liste de (gesture, pos, select).
+        """
+        if not hands:
+            self.lost()
+            self._forget(current_time)
+            return []
+        hands = hands[:self.max_hands]
+        if handedness is None:
+            handedness = [None] * len(hands)
+        else:
+            # Un backend tiers peut renvoyer plus de mains que max_hands
+            handedness = handedness[:len(hands)]
+        points = np.stack([np.asarray(h, dtype=np.float32) for h in hands])
+        f = GestureRecognizer.features(points)
+        assigned = self._match(f["wrist"], handedness, current_time)
+        present = set(id(track) for track in assigned)
+        for track in self.tracks:
+            if id(track) not in present:
+                track.recognizer.lost()
+        for i, track in enumerate(assigned):
+            track.spread = float(f["spread"][i])
+        self._forget(current_time)
+        primary = self._choose_primary(assigned)
+
+        events, assist_select = [], False
+        for i, track in enumerate(assigned):
+            recognizer = track.recognizer
+            if recognizer.filter is not None:
+                smooth = recognizer.filter(points[i], current_time)
+                index = smooth[INDEX_FINGER_TIP]
+                pinch = float(np.linalg.norm(smooth[THUMB_TIP] - smooth[MIDDLE_FINGER_TIP]))
+            else:
+                index, pinch = f["index"][i], float(f["pinch"][i])
+            # Chaque main avance sa machine à états, même secondaire, pour
+            # qu'un changement de main principale ne produise pas de faux swipe
+            step = recognizer._step(f["wrist"][i], index, track.spread, pinch,
+                                    frame_width, frame_height, current_time)
+            if track is primary:
+                events = step
+            elif step and step[-1][2]:
+                assist_select = True
+        if self.two_handed and assist_select and events:
+            gesture, pos, select = events[-1]
+            events[-1] = (gesture, pos, True)
+        return events
+
+    def _match(self, wrists, handedness, current_time):
+        """Piste de chaque main (appariement glouton par distance croissante)."""
+        assigned = [None] * len(wrists)
+        if self.tracks:
+            previous = np.stack([track.wrist for track in self.tracks])
+            dist = np.linalg.norm(previous[:, None, :] - wrists[None, :, :], axis=-1)
+            for t, track in enumerate(self.tracks):
+                for h, label in enumerate(handedness):
+                    if label and track.handedness and label != track.handedness:
+                        dist[t, h] += self.match_dist / 2
+            used = set()
+            for flat in np.argsort(dist, axis=None):
+                t, h = divmod(int(flat), len(wrists))
+                if dist[t, h] > self.match_dist:
+                    break
+                if t in used or assigned[h] is not None:
+                    continue
+                used.add(t)
+                assigned[h] = self.tracks[t]
+        for h, track in enumerate(assigned):
+            if track is None:
+                track = HandTrack(self._next_id, handedness[h],
+                                  GestureRecognizer(**self.recognizer_options), wrists[h], current_time)
+                self._next_id += 1
+                self.tracks.append(track)
+                assigned[h] = track
+            track.wrist = wrists[h]
+            track.last_seen = current_time
+            if handedness[h]:
+                track.handedness = handedness[h]
+        return assigned
+
+    def _forget(self, current_time):
+        self.tracks = [track for track in self.tracks
+                       if current_time - track.last_seen <= self.forget_after]
+        if self.primary_id is not None and all(track.id != self.primary_id for track in self.tracks):
+            self.primary_id = None
+
+    def _choose_primary(self, present):
+        """Main principale parmi les mains visibles (None : elle est momentanément absente)."""
+        current = next((track for track in present if track.id == self.primary_id), None)
+        if self.primary in ("right", "left"):
+            wanted = self.primary.capitalize()
+            if current is None or current.handedness != wanted:
+                preferred = [track for track in present if track.handedness == wanted]
+                if preferred:
+                    current = min(preferred, key=lambda track: track.id)
+        elif self.primary == "largest" and current is not None:
+            largest = max(present, key=lambda track: track.spread)
+            if largest.spread > 1.2 * current.spread:
+                current = largest
+        if current is None and self.primary_id is None:
+            # Pas de main principale (ou oubliée) : la plus ancienne visible
+            if self.primary == "largest":
+                current = max(present, key=lambda track: track.spread)
+            else:
+                current = min(present, key=lambda track: track.id)
+        if current is not None:
+            self.primary_id = current.id
+        return current
+
+
+# --- Enregistrement binaire -------------------------------------------------
+# En-tête : magic, version, largeur, hauteur, nb de landmarks.
+# Puis par image : horodatage (float64), nb de mains (uint8), et pour chaque
+# main NUM_LANDMARKS x (x, y) en float16 (84 octets).
+_MAGIC = b"MFLM"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHHH")
+_FRAME = struct.Struct("<dB")
+
+
+class LandmarkRecorder:
+    """Écrit un flux de landmarks dans un fichier binaire compact."""
+
+    def __init__(self, path, frame_width, frame_height):
+        self.path = path
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, frame_width, frame_height, NUM_LANDMARKS))
+        self.frames = 0
+
+    def write(self, timestamp, hands):
+        """`hands` : liste de tableaux (21, 2) normalisés (vide si aucune main)."""
+        self._file.write(_FRAME.pack(timestamp, len(hands)))
+        for points in hands:
+            self._file.write(np.asarray(points, dtype="<f2").tobytes())
+        self.frames += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_landmarks(path):
+    """Lit un enregistrement : (en-tête, itérateur de (t, [mains (21, 2)]))."""
+    f = open(path, "rb")
+    magic, version, width, height, count = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != _MAGIC or version != _VERSION:
+        f.close()
+        raise ValueError(f"{path} : enregistrement de landmarks invalide")
+    header = {"frame_width": width, "frame_height": height, "landmarks": count}
+    hand_size = count * 2 * 2
+
+    def frames():
+        with f:
+            while True:
+                raw = f.read(_FRAME.size)
+                if len(raw) < _FRAME.size:
+                    return
+                timestamp, n_hands = _FRAME.unpack(raw)
+                hands = [np.frombuffer(f.read(hand_size), dtype="<f2").astype(np.float32).reshape(count, 2)
+                         for _ in range(n_hands)]
+                yield timestamp, hands
+
+    return header, frames()
+
+
+def load_landmarks(path):
+    """
+    Charge un enregistrement en tableaux : (en-tête, temps (N,), points
+    (N, 21, 2) de la première main, NaN si aucune main).
+    """
+    header, frames = iter_landmarks(path)
+    times, points = [], []
+    empty = np.full((header["landmarks"], 2), np.nan, dtype=np.float32)
+    for timestamp, hands in frames:
+        times.append(timestamp)
+        points.append(hands[0] if hands else empty)
+    if not points:
+        return header, np.zeros(0), np.zeros((0, header["landmarks"], 2), dtype=np.float32)
+    return header, np.asarray(times), np.stack(points)
+
+
+# --- Rejeu / mesure ---------------------------------------------------------
+def replay(path, gesture_callback=None, recognizer=None, realtime=False, tracker=None):
+    """
+    Rejoue un enregistrement : chaque image passe par le recognizer (première
+    main), ou par `tracker` (HandTracker, toutes les mains) s'il est fourni ;
+    les gestes sont transmis à `gesture_callback` (même convention que
+    CameraWidget : select uniquement pour "navigate").
+
+    Renvoie les événements [(t, gesture, pos, select)] et les statistiques de
+    coût par image (reconnaissance seule, puis callback).
+    """
+    header, frames = iter_landmarks(path)
+    recognizer = recognizer or GestureRecognizer()
+    width, height = header["frame_width"], header["frame_height"]
+    events, recognize_cost, callback_cost = [], [], []
+    start_wall, start_t = time.perf_counter(), None
+    for timestamp, hands in frames:
+        if realtime:
+            if start_t is None:
+                start_t = timestamp
+            delay = (timestamp - start_t) - (time.perf_counter() - start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        t0 = time.perf_counter()
+        if tracker is not None:
+            frame_events = tracker.update(hands, None, width, height, timestamp)
+        elif hands:
+            frame_events = recognizer.update(hands[0], width, height, timestamp)
+        else:
+            recognizer.lost()
+            frame_events = []
+        t1 = time.perf_counter()
+        recognize_cost.append(t1 - t0)
+        for gesture, pos, select in frame_events:
+            events.append((timestamp, gesture, pos, select))
+            if gesture_callback is not None:
+                if gesture == "navigate":
+                    gesture_callback(gesture, pos, select)
+                else:
+                    gesture_callback(gesture, pos)
+        callback_cost.append(time.perf_counter() - t1)
+    stats = {
+        "frames": len(recognize_cost),
+        "recognize_mean_us": 1e6 * float(np.mean(recognize_cost)) if recognize_cost else 0.0,
+        "recognize_p95_us": 1e6 * percentile(sorted(recognize_cost), 95),
+        "callback_mean_us": 1e6 * float(np.mean(callback_cost)) if callback_cost else 0.0,
+        "callback_p95_us": 1e6 * percentile(sorted(callback_cost), 95),
+        "events": {g: sum(1 for e in events if e[1] == g) for g in GESTURES},
+    }
+    return events, stats
+
+
+def load_labels(path):
+    """Annotations attendues : JSON [{"t": secondes, "gesture": "open_menu"}, ...]."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [(float(label["t"]), label["gesture"]) for label in json.load(f)]
+
+
+def score_events(events, labels, tolerance=0.25, gestures=("open_menu", "swipe_right")):
+    """
+    Précision / rappel par geste : un événement est correct s'il tombe à
+    moins de `tolerance` secondes d'une annotation du même geste non encore
+    appariée.
+    """
+    scores = {}
+    for gesture in gestures:
+        detected = [e[0] for e in events if e[1] == gesture]
+        expected = sorted(t for t, g in labels if g == gesture)
+        matched = [False] * len(expected)
+        hits = 0
+        for t in detected:
+            for i, t_expected in enumerate(expected):
+                if not matched[i] and abs(t - t_expected) <= tolerance:
+                    matched[i] = True
+                    hits += 1
+                    break
+        scores[gesture] = {
+            "detected": len(detected),
+            "expected": len(expected),
+            "precision": hits / len(detected) if detected else 1.0,
+            "recall": hits / len(expected) if expected else 1.0,
+        }
+    return scores
+
+
+def synthetic_landmarks(path, frames=600, fps=30.0, frame_width=640, frame_height=480, seed=0):
+    """
+    Génère un enregistrement synthétique (main qui dérive, monte
+    régulièrement et pince de temps en temps) pour les benchmarks sans
+    caméra. Renvoie les annotations correspondantes.
+    """
+    rng = np.random.default_rng(seed)
+    # Main "au repos" : doigts étalés autour du poignet
+    base = rng.uniform(-0.08, 0.08, size=(NUM_LANDMARKS, 2)).astype(np.float32)
+    base[WRIST] = (0.0, 0.12)
+    base[MIDDLE_FINGER_TIP] = (0.0, -0.08)
+    base[THUMB_TIP] = (-0.08, 0.0)
+    labels = []
+    center = np.array([0.5, 0.6], dtype=np.float32)
+    with LandmarkRecorder(path, frame_width, frame_height) as recorder:
+        for i in range(frames):
+            t = i / fps
+            phase = i % 90
+            offset = rng.normal(0, 0.002, size=2).astype(np.float32)
+            hand = base + center + offset
+            if phase == 30:
+                # Montée rapide de la main : ouverture
+                hand[:, 1] -= 0.15
+                labels.append((t, "open_menu"))
+            elif 60 <= phase < 66:
+                # Pincement pouce / majeur : sélection
+                hand[THUMB_TIP] = hand[MIDDLE_FINGER_TIP] + 0.005
+            elif phase == 80:
+                # Main perdue une image
+                recorder.write(t, [])
+                continue
+            recorder.write(t, [hand])
+    return labels
@@ -0,0 +1,12 @@
+"""
+Statistiques communes aux mesures MeFu (LatencyMonitor, rejeu de gestes,
+benchmarks, traces), sans dépendance : importable partout, y compris par
+les outils en ligne de commande.
+"""
+
+
+def percentile(ordered, q):
+    """Percentile `q` (rang le plus proche) d'une liste déjà triée ; 0.0 si vide."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
@@ -0,0 +1,313 @@
+"""
+Journal d'interactions MeFu : anneau binaire en mémoire projetée (mmap).
+
+- EventTracer : écrit chaque événement (souris, ouverture, geste, action,
+  entrée dans un sous-menu, retour) en un enregistrement fixe de 24 octets dans un fichier projeté en
+  mémoire ; les plus anciens sont écrasés quand l'anneau est plein. Le
+  fichier reste lisible après un arrêt brutal de l'application.
+- read_trace / summarize : relecture et statistiques (durées par type,
+  gestes, handlers).
+- replay : rejoue les événements d'entrée d'une trace vers un MeFu sans
+  affichage et compare les durées.
+
+Ligne de commande :
+
+    python mefu_trace.py dump trace.mft [--last 50]
+    python mefu_trace.py summary trace.mft
+    python mefu_trace.py replay trace.mft [--menu menu.json] [--speed 1.0]
+
+Indépendant de Kivy sauf pour replay.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+
+from mefu_stats import percentile
+
+# En-tête : magic, version, taille d'enregistrement, capacité (enregistrements),
+# taille de la table des noms, octets utilisés de cette table, nombre total
+# d'événements écrits, heure de début (time.time), taille de la fenêtre.
+# Puis la table des noms (UTF-8, un nom par ligne), puis l'anneau.
+_MAGIC = b"MFTR"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIIIQdHH")
+_HEADER_SIZE = 64
+_COUNT_OFFSET = 20
+_NAMES_USED_OFFSET = 16
+# Enregistrement : t (s depuis le début), type, drapeaux, code (nom ou
+# profondeur après un retour), x, y, durée de traitement (ms)
+_RECORD = struct.Struct("<dBBHfff")
+_COUNT = struct.Struct("<Q")
+
+MOUSE = 1
+SHOW_MENU = 2
+GESTURE = 3
+ACTION = 4
+BACK = 5
+ENTER = 6
+KINDS = {MOUSE: "mouse", SHOW_MENU: "show_menu", GESTURE: "gesture", ACTION: "action", BACK: "back",
+         ENTER: "enter"}
+
+SELECT = 1   # geste "navigate" avec sélection
+NESTED = 2   # déclenché pendant le traitement d'un autre événement tracé
+ERROR = 4    # le handler a levé une exception
+
+NO_NAME = 0xFFFF
+
+
+class EventTracer:
+    """
+    Écrivain de trace, à n'utiliser que depuis le thread Kivy (aucun verrou).
+    Coût d'un événement : un struct.pack_into dans l'anneau et la mise à
+    jour du compteur d'en-tête. Une trace existante à `path` (session
+    précédente, éventuellement interrompue) est conservée sous `path`.1 ;
+    la précédente `.1` est écrasée.
+    """
+
+    def __init__(self, path, capacity=65536, names_size=8192, window_size=(0, 0)):
+        self.path = path
+        self.capacity = capacity
+        self.names_size = names_size
+        self._ring_offset = _HEADER_SIZE + names_size
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            os.replace(path, os.fspath(path) + ".1")
+        self._file = open(path, "w+b")
+        self._file.truncate(self._ring_offset + capacity * _RECORD.size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self.count = 0
+        self._names = {}
+        self._names_used = 0
+        self._depth = 0
+        self._pack_record = _RECORD.pack_into
+        self._pack_count = _COUNT.pack_into
+        self._t0 = time.perf_counter()
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, _RECORD.size, capacity, names_size, 0, 0,
+                          time.time(), int(window_size[0]), int(window_size[1]))
+
+    def name_id(self, name):
+        """Identifiant d'un nom (handler, geste, bouton, path_id) dans la table ; NO_NAME si pleine."""
+        ident = self._names.get(name)
+        if ident is not None:
+            return ident
+        raw = str(name).replace("\n", " ").encode("utf-8") + b"\n"
+        if self._names_used + len(raw) > self.names_size or len(self._names) >= NO_NAME:
+            return NO_NAME
+        start = _HEADER_SIZE + self._names_used
+        self._mm[start:start + len(raw)] = raw
+        self._names_used += len(raw)
+        struct.pack_into("<I", self._mm, _NAMES_USED_OFFSET, self._names_used)
+        ident = self._names[name] = len(self._names)
+        return ident
+
+    def begin(self):
+        """Début du traitement d'un événement : renvoie l'instant de départ."""
+        self._depth += 1
+        return time.perf_counter()
+
+    def record(self, kind, start, code=0, flags=0, x=0.0, y=0.0):
+        """Fin du traitement commencé par begin() : écrit l'événement."""
+        now = time.perf_counter()
+        self._depth -= 1
+        if self._depth > 0:
+            flags |= NESTED
+        offset = self._ring_offset + (self.count % self.capacity) * _RECORD.size
+        self._pack_record(self._mm, offset, start - self._t0, kind, flags, code,
+                          x, y, 1e3 * (now - start))
+        self.count += 1
+        self._pack_count(self._mm, _COUNT_OFFSET, self.count)
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
+        self._mm = None
+
+
+# --- Lecture ------------------------------------------------------------------
+def read_trace(path):
+    """
+    (en-tête, noms, événements) ; événements du plus ancien au plus récent,
+    chacun un dict t, kind, flags, code, name, x, y, duration_ms.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, record_size, capacity, names_size, names_used, count, started, win_w, win_h = \
+        _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION or record_size != _RECORD.size:
+        raise ValueError(f"{path} : trace MeFu invalide")
+    names = data[_HEADER_SIZE:_HEADER_SIZE + names_used].decode("utf-8").split("\n")[:-1]
+    ring = _HEADER_SIZE + names_size
+    stored = min(count, capacity)
+    first = count - stored
+    events = []
+    for n in range(first, count):
+        t, kind, flags, code, x, y, duration = _RECORD.unpack_from(data, ring + (n % capacity) * record_size)
+        named = kind in (MOUSE, GESTURE, ACTION, ENTER)
+        events.append({
+            "t": t, "kind": KINDS.get(kind, str(kind)), "flags": flags, "code": code,
+            "name": names[code] if named and code < len(names) else None,
+            "x": x, "y": y, "duration_ms": duration,
+        })
+    header = {
+        "capacity": capacity, "count": count, "dropped": first, "started": started,
+        "window_size": (win_w, win_h),
+    }
+    return header, names, events
+
+
+def _durations(events):
+    values = sorted(e["duration_ms"] for e in events)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "max_ms": values[-1] if values else 0.0,
+    }
+
+
+def summarize(header, events):
+    """Volumes et durées de traitement par type, par geste et par handler."""
+    span = events[-1]["t"] - events[0]["t"] if len(events) > 1 else 0.0
+    by_kind, by_gesture, by_action = {}, {}, {}
+    for event in events:
+        by_kind.setdefault(event["kind"], []).append(event)
+        if event["kind"] == "gesture":
+            by_gesture.setdefault(event["name"], []).append(event)
+        elif event["kind"] == "action":
+            by_action.setdefault(event["name"], []).append(event)
+    return {
+        "events": len(events),
+        "dropped": header["dropped"],
+        "span_s": span,
+        "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(header["started"])),
+        "kinds": {kind: _durations(items) for kind, items in by_kind.items()},
+        "gestures": {name: _durations(items) for name, items in by_gesture.items()},
+        "actions": {name: dict(_durations(items), errors=sum(1 for e in items if e["flags"] & ERROR))
+                    for name, items in by_action.items()},
+    }
+
+
+def format_event(event):
+    flags = "".join(label for bit, label in ((SELECT, "S"), (NESTED, "N"), (ERROR, "E")) if event["flags"] & bit)
+    detail = event["name"] if event["name"] is not None else (event["code"] if event["kind"] == "back" else "")
+    return (f"{event['t']:10.3f}s {event['kind']:<9} {str(detail):<16} {flags:<3} "
+            f"({event['x']:7.1f}, {event['y']:7.1f}) {event['duration_ms']:8.3f} ms")
+
+
+# --- Rejeu ----------------------------------------------------------------------
+# Kivy sans console ni parsing d'arguments, fenêtre SDL hors écran
+_REPLAY_ENV = {
+    "KIVY_NO_ARGS": "1",
+    "KIVY_NO_CONSOLELOG": "1",
+    "SDL_VIDEODRIVER": "offscreen",
+}
+
+
+def replay(path, menu_config=None, speed=1.0):
+    """
+    Rejoue les événements d'entrée (non NESTED) d'une trace vers un MeFu
+    sans affichage, dans l'ordre et, si `speed` > 0, au rythme d'origine
+    (horloge Kivy entretenue entre deux événements). Les durées mesurées au
+    rejeu sont tracées dans un fichier temporaire et comparées à l'original.
+    Les handlers appelés dans la trace sont remplacés par des fonctions vides :
+    seul le coût de MeFu autour d'eux est rejoué.
+    """
+    import tempfile
+    for key, value in _REPLAY_ENV.items():
+        os.environ.setdefault(key, value)
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+    import mefu as mefu_module
+
+    header, names, events = read_trace(path)
+    if header["window_size"][0] and header["window_size"][1]:
+        Window.size = header["window_size"]
+    mefu = mefu_module.headless_mefu(menu_config)
+    for handler in {e["name"] for e in events if e["kind"] == "action" and e["name"] is not None}:
+        mefu.add_action(handler, lambda: None)
+    replay_path = os.path.join(tempfile.mkdtemp(prefix="mefu-replay-"), "replay.mft")
+    mefu_module.disable_event_tracer()
+    mefu_module.enable_event_tracer(replay_path, capacity=max(1024, len(events) * 2))
+    wall_start = time.perf_counter()
+    first_t = events[0]["t"] if events else 0.0
+    replayed = 0
+    try:
+        for event in events:
+            if event["flags"] & NESTED:
+                continue
+            if speed > 0:
+                due = wall_start + (event["t"] - first_t) / speed
+                while time.perf_counter() < due:
+                    Clock.tick()
+                    time.sleep(min(1.0 / 120, max(0.0, due - time.perf_counter())))
+            pos = (event["x"], event["y"])
+            kind = event["kind"]
+            if kind == "mouse":
+                mefu._on_mouse(Window, event["x"], event["y"], event["name"], [])
+            elif kind == "show_menu":
+                mefu.show_menu(pos)
+            elif kind == "gesture":
+                mefu.gesture_callback(event["name"], pos, bool(event["flags"] & SELECT))
+            elif kind == "action":
+                mefu._execute_action(event["name"])
+            elif kind == "enter":
+                node = mefu.find_node(event["name"])
+                if node is not None and node.children:
+                    mefu._enter_node(node)
+            elif kind == "back":
+                mefu._go_back()
+            replayed += 1
+    finally:
+        mefu_module.disable_event_tracer()
+    _, _, replayed_events = read_trace(replay_path)
+    original = summarize(header, events)["kinds"] if events else {}
+    again = summarize({"dropped": 0, "started": time.time()}, replayed_events)["kinds"] if replayed_events else {}
+    return {
+        "replayed": replayed,
+        "kinds": {kind: {"original_p50_ms": original[kind]["p50_ms"],
+                         "replay_p50_ms": again.get(kind, {}).get("p50_ms")}
+                  for kind in original},
+    }
+
+
+def _load_menu(path):
+    if path is None:
+        return None
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traces d'interactions MeFu")
+    parser.add_argument("command", choices=("dump", "summary", "replay"))
+    parser.add_argument("trace")
+    parser.add_argument("--last", type=int, default=None, help="dump : seulement les N derniers événements")
+    parser.add_argument("--menu", help="replay : menu_config JSON / YAML (menu de démonstration sinon)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay : vitesse (0 = sans attente)")
+    args = parser.parse_args(argv)
+    if args.command == "replay":
+        print(json.dumps(replay(args.trace, _load_menu(args.menu), args.speed), indent=2))
+        return
+    header, names, events = read_trace(args.trace)
+    if args.command == "summary":
+        print(json.dumps(summarize(header, events), indent=2))
+        return
+    for event in events[-args.last:] if args.last else events:
+        print(format_event(event))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
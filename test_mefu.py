@@ -28,7 +28,7 @@ class MeFuApp:
         if hasattr(mefu, "camera_widget") and mefu.camera_widget:
             mefu.remove_widget(mefu.camera_widget)
             try:
-                mefu.camera_widget.capture.release()
+                mefu.camera_widget.stop()
             except Exception:
                 pass
             mefu.camera_widget = None
@@ -36,6 +36,7 @@ class MeFuApp:
         else:
             mefu.camera_widget = MeFu.CameraWidget(
                 mefu.gesture_callback,
+                gesture_options=mefu.gesture_options,
                 size_hint=(1, 1),
             )
             mefu.camera_widget.opacity = 0